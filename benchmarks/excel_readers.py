@@ -0,0 +1,92 @@
+"""
+Compare les lecteurs de valeurs Excel (cf. docgen.outputs.readers) sur une grande feuille.
+
+    python benchmarks/excel_readers.py --rows 500000
+
+Le classeur est généré dans un dossier temporaire (ou lu depuis --workbook). Pour chaque lecteur et
+chaque plage (haut, milieu, bas de la feuille, débordant de la feuille), le temps mesuré inclut
+l'ouverture du classeur. Les valeurs lues doivent être identiques d'un lecteur à l'autre.
+"""
+import argparse
+import datetime as dt
+from pathlib import Path
+import tempfile
+import time
+
+import openpyxl
+from openpyxl.utils import get_column_letter, range_to_tuple
+
+from docgen.outputs.readers import READERS
+
+
+def make_workbook(path: Path, rows: int, cols: int):
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Data")
+    ws.append([f"col{j}" for j in range(cols)])
+    start = dt.datetime(2020, 1, 1)
+    for i in range(rows):
+        row = []
+        for j in range(cols):
+            if j % 4 == 0:
+                row.append(i * cols + j)
+            elif j % 4 == 1:
+                row.append((i + j) / 7)
+            elif j % 4 == 2:
+                row.append(f"label {i % 1000}")
+            else:
+                row.append(start + dt.timedelta(hours=i))
+        ws.append(row)
+    wb.save(path)
+
+
+def bench(path: Path, ranges: list[str], repeat: int):
+    results = {}
+    for name, reader_class in READERS.items():
+        for range_str in ranges:
+            sheet_name, (min_col, min_row, max_col, max_row) = range_to_tuple(range_str)
+            best = None
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                reader = reader_class(path)
+                try:
+                    values = list(reader.iter_rows(sheet_name, min_row, max_row, min_col, max_col))
+                finally:
+                    reader.close()
+                elapsed = time.perf_counter() - t0
+                best = elapsed if best is None else min(best, elapsed)
+            results[(name, range_str)] = values
+            print(f"{name:>10} {range_str:>24} {best:8.3f} s")
+    for range_str in ranges:
+        reference = results[("openpyxl", range_str)]
+        for name in READERS:
+            if results[(name, range_str)] != reference:
+                print(f"ATTENTION : valeurs différentes de openpyxl pour {name} {range_str}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--cols", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--workbook", type=Path, default=None, help="classeur existant (feuille Data)")
+    ns = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = ns.workbook
+        if path is None:
+            path = Path(tmp) / "bench.xlsx"
+            t0 = time.perf_counter()
+            make_workbook(path, ns.rows, ns.cols)
+            print(f"Classeur de {ns.rows} lignes généré en {time.perf_counter() - t0:.1f} s ({path.stat().st_size / 1e6:.1f} Mo)")
+        middle = ns.rows // 2
+        bench(path, [
+            "Data!A1:J50",
+            f"Data!A{middle}:J{middle + 50}",
+            f"Data!A{ns.rows - 49}:J{ns.rows}",
+            # Au-delà de la dernière ligne et de la dernière colonne : cellules vides
+            f"Data!A{ns.rows - 9}:{get_column_letter(ns.cols + 3)}{ns.rows + 20}",
+        ], ns.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import sys
 from docgen.cli.install import InstallCommand
 from docgen.cli.render import RenderCommand
 from docgen.cli.quarto import QuartoCommand
+from docgen.cli.watch import WatchCommand
 from docgen.utils.path import resolve_path
 
 def cmd_iterator():
@@ -16,6 +17,7 @@ def cmd_iterator():
     """
     yield InstallCommand()
     yield RenderCommand()
+    yield WatchCommand()
     yield QuartoCommand()
 
 def create_parser()->argparse.ArgumentParser:
@@ -43,6 +43,30 @@ class RenderCommand(BaseCommand):
             action="store_true",
             help="Activer le pré-rendu Jinja pour les fichiers .qmd et .md"
         )
+        parser.add_argument(
+            "-j","--jobs",
+            type=int,
+            default=1,
+            help="Nombre de rendus Quarto simultanés. Si > 1, les types de projet sont rendus en parallèle dans des dossiers isolés."
+        )
+        parser.add_argument(
+            "--split-formats",
+            action="store_true",
+            help="Lancer un rendu Quarto distinct par format (à combiner avec --jobs pour les rendre en parallèle)"
+        )
+        parser.add_argument(
+            "--excel-workers",
+            type=int,
+            default=None,
+            help="Nombre de processus pour l'extraction des classeurs Excel (un classeur par processus)."
+        )
+        parser.add_argument(
+            "--no-render-cache",
+            dest="render_cache",
+            action="store_false",
+            default=None,
+            help="Forcer le rendu Quarto même si les entrées sont identiques à celles du dernier rendu réussi"
+        )
 
     def main(self, ns:argparse.Namespace,rest_args) -> None:
         renderer = Renderer(
@@ -51,7 +75,11 @@ class RenderCommand(BaseCommand):
             output_dir=ns.output_dir,
             formats=ns.to,
             jinja=ns.jinja,
-            quarto_render_args=rest_args
+            quarto_render_args=rest_args,
+            render_cache=ns.render_cache,
+            jobs=ns.jobs,
+            split_formats=ns.split_formats,
+            excel_workers=ns.excel_workers
         )
         renderer.render()
 
@@ -0,0 +1,52 @@
+import argparse
+from pathlib import Path
+from docgen.renderers.renderer import Renderer
+from docgen.renderers.watch import WatchSession
+from docgen.cli.base import BaseCommand
+from docgen.settings import settings
+
+
+class WatchCommand(BaseCommand):
+    name = "watch"
+    help = """Prévisualise un rapport ou un site web avec `quarto preview` et met à jour le pré-rendu à chaque modification des sources, des classeurs référencés ou du _variables.yml. Les arguments autres que ceux cités ci-dessous sont directement passés à la commande `quarto preview`."""
+
+    def setup_parser(self, parser:argparse.ArgumentParser):
+        parser.add_argument(
+            "src",
+            nargs='?',
+            default=None,
+            type=Path,
+            help="Répertoire ou fichier principal (.qmd/.md). Si non spécifié, utilise le répertoire courant."
+        )
+        parser.add_argument(
+            "--pt","--project-type",
+            dest="project_type",
+            choices=settings.get_available_project_types(),
+            default=None,
+            help="Type de projet à prévisualiser.")
+        parser.add_argument(
+            "--to",
+            choices=settings.get_available_formats(),
+            default=None,
+            help="Format à prévisualiser."
+        )
+        parser.add_argument(
+            "--jinja",
+            action="store_true",
+            help="Activer le pré-rendu Jinja pour les fichiers .qmd et .md"
+        )
+        parser.add_argument(
+            "--polling",
+            action="store_true",
+            help="Surveiller les fichiers par scrutation, même si watchdog est installé (partages réseau, ...)"
+        )
+
+    def main(self, ns:argparse.Namespace,rest_args) -> None:
+        renderer = Renderer(
+            source=ns.src,
+            project_types=ns.project_type,
+            formats=ns.to,
+            jinja=ns.jinja,
+            quarto_render_args=rest_args,
+        )
+        WatchSession(renderer, preview_args=rest_args, polling=ns.polling).run()
@@ -0,0 +1,98 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+import re
+from docgen.regular_expressions import DynotecRegularExpressions
+
+# Motif propre à chaque type de référence : les groupes des matches sont ceux attendus par les outputs
+REFERENCE_PATTERNS = {
+    "excel_img": DynotecRegularExpressions.excel_img_syntax,
+    "excel_table": DynotecRegularExpressions.excel_table_syntax,
+    "image": DynotecRegularExpressions.path_in_img,
+    "include": DynotecRegularExpressions.quarto_include,
+}
+
+
+@dataclass
+class Reference:
+    """
+    Référence typée d'un document : image, tableau ou image Excel, inclusion Quarto.
+    """
+    kind: str
+    match: re.Match
+
+    @property
+    def start(self) -> int:
+        return self.match.start()
+
+    @property
+    def end(self) -> int:
+        return self.match.end()
+
+
+@dataclass
+class Document:
+    """
+    Modèle en mémoire d'un document markdown : son texte et ses références,
+    obtenues en une seule passe (cf. DynotecRegularExpressions.references).
+    """
+    path: Path
+    text: str
+    references: list[Reference] = field(default_factory=list)
+
+    @classmethod
+    def scan(cls, text: str, path: Path = None) -> 'Document':
+        references = []
+        for m in DynotecRegularExpressions.references.finditer(text):
+            kind = m.lastgroup
+            if kind == "shortcode":
+                # Seules les inclusions parmi les shortcodes sont des références ; le parcours
+                # continue après le début du shortcode
+                kind = "include"
+                match = REFERENCE_PATTERNS[kind].match(text, m.start())
+                if match is None:
+                    continue
+            else:
+                # Même motif, même position : mêmes groupes que le motif seul
+                match = REFERENCE_PATTERNS[kind].match(text, m.start())
+            references.append(Reference(kind=kind, match=match))
+        return cls(path=path, text=text, references=references)
+
+    def of_kind(self, *kinds: str) -> list[Reference]:
+        return [r for r in self.references if r.kind in kinds]
+
+    def includes(self) -> list[str]:
+        """
+        Chemins inclus par {{< include ... >}}, tels qu'écrits dans le document.
+        """
+        return [r.match.group(1).strip() for r in self.of_kind("include")]
+
+    def line_number(self, position: int) -> int:
+        return self.text.count("\n", 0, position) + 1
+
+    def rewrite(self, substitutions: list[tuple[int, int, str]]) -> str:
+        """
+        Texte du document où chaque intervalle [start, end[ est remplacé par son texte, en une passe :
+        les morceaux sont assemblés par un seul join.
+
+        Raises:
+            ValueError: si deux intervalles se chevauchent
+        """
+        parts = []
+        position = 0
+        for start, end, text in sorted(substitutions, key=lambda s: (s[0], s[1])):
+            if start < position:
+                raise ValueError(f"Substitutions superposées dans {self.path} (ligne {self.line_number(start)}, "
+                                 f"positions {start}-{end} et précédente jusqu'à {position})")
+            parts.append(self.text[position:start])
+            parts.append(text)
+            position = end
+        parts.append(self.text[position:])
+        return "".join(parts)
+
+
+def escape_shortcodes(text: str) -> str:
+    """
+    Echappe les shortcodes Quarto pour jinja, en une seule passe.
+    """
+    return DynotecRegularExpressions.shortcode.sub(
+        lambda m: "{{'{{< '}}" if m.lastgroup == "start" else "{{' >}}'}}", text)
@@ -1,6 +1,12 @@
+from functools import cache
+import hashlib
+import json
+import logging
 from pathlib import Path
+import re
+import shutil
 from docgen.settings import settings
-from docgen.quarto import run as quarto_run
+from docgen.utils.path import write_if_changed
 
 ROOT = settings.package_directory / "extensions" / "docgen"
 SRC = ROOT / "_extensions"
@@ -8,11 +14,70 @@ SRC_FILES = ROOT / "_extensions-files"
 
 EXT_NAMES = ["docgen"]
 
-def add_extension(dest:Path,*other_cmd):
-    cmd = ["add",str(SRC)]
-    cmd.extend(other_cmd)
-    quarto_run(cmd, cwd=dest)
+logger = logging.getLogger(__name__)
+
+REG_YML_VERSION = re.compile(r"^version:\s*(\S+)", re.MULTILINE)
+
+# Fichier d'installation de l'extension dans le build_dir : version et empreinte installées
+INSTALL_STAMP = ".docgen-install.json"
+
+# Chemins du build_dir gérés par l'installation de l'extension, à conserver entre deux rendus
+PERSISTENT_PATHS = ["_extensions"]
+
+def extension_version(ext_name:str = "docgen") -> str:
+    """
+    Version de l'extension, lue dans son _extension.yml.
+    """
+    m = REG_YML_VERSION.search((SRC / ext_name / "_extension.yml").read_text(encoding=settings.yml_encoding))
+    return m.group(1) if m else ""
+
+def install_extension(dest:Path) -> bool:
+    """
+    Installe l'extension dans dest par copie directe (sans `quarto add`),
+    uniquement si la version ou le contenu de l'extension ont changé depuis la dernière installation.
+
+    Returns:
+        bool: True si l'extension a été (ré)installée.
+    """
+    dest_extensions = dest / "_extensions"
+    stamp = dest_extensions / INSTALL_STAMP
+    expected = {
+        "versions": {ext_name: extension_version(ext_name) for ext_name in EXT_NAMES},
+        "fingerprint": extension_fingerprint(),
+    }
+    if stamp.exists() and all((dest_extensions / ext_name / "_extension.yml").exists() for ext_name in EXT_NAMES):
+        try:
+            if json.loads(stamp.read_text(encoding="utf-8")) == expected:
+                logger.debug(f"Extension déjà installée dans {dest}")
+                return False
+        except ValueError:
+            pass
+
+    for ext_name in EXT_NAMES:
+        target = dest_extensions / ext_name
+        if target.exists():
+            shutil.rmtree(target)
+        shutil.copytree(SRC / ext_name, target)
     set_path_to_files(dest)
+    write_if_changed(stamp, json.dumps(expected))
+    logger.info(f"Extension {','.join(EXT_NAMES)} installée dans {dest}")
+    return True
+
+@cache
+def extension_fingerprint() -> str:
+    """
+    Empreinte du contenu de l'extension docgen (_extensions et _extensions-files).
+    Calculée une fois par processus : les fichiers du package ne changent pas en cours d'exécution.
+    """
+    hasher = hashlib.sha256()
+    # Le chemin absolu des fichiers est écrit dans le _extension.yml installé
+    hasher.update(Path(SRC_FILES).as_posix().encode("utf-8"))
+    for root in (Path(SRC), Path(SRC_FILES)):
+        for p in sorted(root.rglob("*")):
+            if p.is_file():
+                hasher.update(p.relative_to(root).as_posix().encode("utf-8"))
+                hasher.update(p.read_bytes())
+    return hasher.hexdigest()
 
 def set_path_to_files(dest_dir:Path):
     dest = dest_dir / "_extensions"
@@ -24,4 +89,4 @@ def set_path_to_files(dest_dir:Path):
         if p__extension_yml.exists() and p_files.exists():
             content = p__extension_yml.read_text(encoding=settings.yml_encoding)
             content = content.replace("PATH_TO_FILES/",p_files.as_posix() + "/")
-            p__extension_yml.write_text(content, encoding=settings.yml_encoding)
\ No newline at end of file
+            write_if_changed(p__extension_yml, content, encoding=settings.yml_encoding)
@@ -0,0 +1,81 @@
+-- Variantes d'images par format (réduites, converties), produites par docgen render
+-- cf. docgen.outputs.image_variants : generated/image_variants.json associe à chaque image
+-- (chemin dans le projet) le chemin de sa variante pour html, pdf et docx.
+
+local MAPPING = "generated/image_variants.json"
+local variants = nil
+
+local function load_variants()
+  if variants ~= nil then
+    return variants
+  end
+  variants = {}
+  local project_dir = quarto.project.directory
+  if project_dir == nil then
+    return variants
+  end
+  local f = io.open(pandoc.path.join({ project_dir, MAPPING }), "r")
+  if f == nil then
+    return variants
+  end
+  local ok, decoded = pcall(quarto.json.decode, f:read("a"))
+  f:close()
+  if ok and type(decoded) == "table" then
+    variants = decoded
+  end
+  return variants
+end
+
+local function current_format()
+  if quarto.doc.is_format("html") then
+    return "html"
+  elseif quarto.doc.is_format("latex") or quarto.doc.is_format("pdf") then
+    return "pdf"
+  elseif quarto.doc.is_format("docx") then
+    return "docx"
+  end
+  return nil
+end
+
+-- Chemin normalisé (séparateurs /, sans . ni ..)
+local function normalize(path)
+  local parts = {}
+  for part in string.gmatch(path, "[^/\\]+") do
+    if part == ".." then
+      table.remove(parts)
+    elseif part ~= "." then
+      table.insert(parts, part)
+    end
+  end
+  return table.concat(parts, "/")
+end
+
+function Image(el)
+  local fmt = current_format()
+  -- Les url (http:, data:, ...) ne sont pas concernées
+  if fmt == nil or el.src:match("^%a[%w+.-]*:") then
+    return nil
+  end
+  local mapping = load_variants()
+  if next(mapping) == nil then
+    return nil
+  end
+  local project_dir = quarto.project.directory
+  local doc_dir = pandoc.path.directory(quarto.doc.input_file)
+  local candidates
+  if el.src:sub(1, 1) == "/" then
+    candidates = { normalize(el.src) }
+  else
+    -- Relatif au document, ou au projet (images hors source copiées dans generated/)
+    local rel_doc_dir = pandoc.path.make_relative(doc_dir, project_dir)
+    candidates = { normalize(rel_doc_dir .. "/" .. el.src), normalize(el.src) }
+  end
+  for _, key in ipairs(candidates) do
+    local entry = mapping[key]
+    if entry ~= nil and entry[fmt] ~= nil then
+      el.src = pandoc.path.make_relative(pandoc.path.join({ project_dir, entry[fmt] }), doc_dir, true)
+      return el
+    end
+  end
+  return nil
+end
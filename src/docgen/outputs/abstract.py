@@ -12,6 +12,7 @@ class AbstractOutput:
     content_path:Path
     container: 'OutputsContainer' = field(init=False, default=None)
     sub_by: str = field(default='',init=False)
+    dependencies: list[Path] = field(default_factory=list,init=False) # fichiers lus pour construire l'output
 
 
     @property
@@ -30,6 +31,18 @@ class AbstractOutput:
         """
         yield
 
-    
+
+    def prepare(self):
+        """
+        Etape préalable à build(), pour tous les outputs avant toute construction.
+        """
+        pass
+
     def build(self):
-        pass
\ No newline at end of file
+        pass
+
+    def includes(self) -> list[str]:
+        """
+        Chemins inclus ({{< include >}}) par le texte de substitution sub_by.
+        """
+        return []
\ No newline at end of file
@@ -0,0 +1,183 @@
+from dataclasses import dataclass, field
+import datetime as dt
+import json
+import logging
+import os
+from pathlib import Path
+import shutil
+import uuid
+
+import numpy as np
+
+from docgen.outputs.plan import SheetBlock
+from docgen.settings import settings
+from docgen.utils.hashing import fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Types de valeurs de cellules (kinds.npy). La valeur est dans nums.npy, directement
+# ou comme indice dans la table de chaînes (strings.json) pour les types de _FROM_TABLE
+NONE, FLOAT, INT, BOOL, TIMEDELTA, STR, BIGINT, DATETIME, DATE, TIME = range(10)
+_FROM_TABLE = {
+    STR: str,
+    BIGINT: int, # entiers non représentables exactement en float64
+    DATETIME: dt.datetime.fromisoformat,
+    DATE: dt.date.fromisoformat,
+    TIME: dt.time.fromisoformat,
+}
+
+
+def _encode(value, strings: dict[str, int]) -> tuple[int, float]:
+    def table(kind, s):
+        return kind, strings.setdefault(s, len(strings))
+    if value is None:
+        return NONE, 0.0
+    if isinstance(value, bool):
+        return BOOL, float(value)
+    if isinstance(value, int):
+        return (INT, float(value)) if abs(value) < 2**53 else table(BIGINT, str(value))
+    if isinstance(value, float):
+        return FLOAT, value
+    if isinstance(value, dt.datetime):
+        return table(DATETIME, value.isoformat())
+    if isinstance(value, dt.date):
+        return table(DATE, value.isoformat())
+    if isinstance(value, dt.time):
+        return table(TIME, value.isoformat())
+    if isinstance(value, dt.timedelta):
+        return TIMEDELTA, value.total_seconds()
+    return table(STR, str(value))
+
+
+@dataclass
+class CachedSheetBlock(SheetBlock):
+    """
+    Bloc de valeurs issu du cache disque, en colonnes typées projetées en mémoire (memory-map) :
+    seules les plages découpées sont décodées.
+    """
+    kinds: np.ndarray = field(default=None, repr=False)
+    nums: np.ndarray = field(default=None, repr=False)
+    strings: list[str] = field(default_factory=list, repr=False)
+
+    def contains(self, boundaries: tuple) -> bool:
+        min_col, min_row, max_col, max_row = boundaries
+        return (self.min_col <= min_col and max_col <= self.max_col
+                and self.min_row <= min_row and max_row <= self.max_row)
+
+    def _decode(self, kind: int, num: float):
+        if kind == NONE:
+            return None
+        if kind == FLOAT:
+            return num
+        if kind == INT:
+            return int(num)
+        if kind == BOOL:
+            return bool(num)
+        if kind == TIMEDELTA:
+            return dt.timedelta(seconds=num)
+        return _FROM_TABLE[kind](self.strings[int(num)])
+
+    def slice(self, boundaries: tuple) -> list[list]:
+        min_col, min_row, max_col, max_row = boundaries
+        rows = slice(min_row - self.min_row, max_row - self.min_row + 1)
+        cols = slice(min_col - self.min_col, max_col - self.min_col + 1)
+        return [[self._decode(k, n) for k, n in zip(kinds, nums)]
+                for kinds, nums in zip(self.kinds[rows, cols].tolist(), self.nums[rows, cols].tolist())]
+
+
+class SheetBlockCache:
+    """
+    Cache disque, partagé entre les rendus et les projets, des blocs de valeurs lus dans les feuilles
+    (cf. ExtractionPlan). Un bloc est identifié par la signature de la feuille dans l'archive xlsx
+    (cf. sheet_signature) et par le lecteur qui l'a rempli (cf. settings.excel_reader) : le même
+    classeur référencé depuis plusieurs projets n'est lu qu'une fois.
+
+    Chaque entrée est un dossier : kinds.npy (int8) et nums.npy (float64) de forme (lignes, colonnes),
+    strings.json (table des chaînes) et meta.json (rectangle du bloc).
+    """
+    VERSION = 1
+
+    def __init__(self, cache_dir: Path = None, max_entries: int = None):
+        self.cache_dir = Path(cache_dir or settings.dynotec_home / "cache" / "excel_blocks")
+        self.max_entries = settings.excel_block_cache_max_entries if max_entries is None else max_entries
+
+    @classmethod
+    def key(cls, signature: list, sheet_name: str, reader: str) -> str:
+        return fingerprint(cls.VERSION, signature, sheet_name, reader)
+
+    def boundaries(self, key: str) -> tuple:
+        """
+        Rectangle (min_col, min_row, max_col, max_row) du bloc en cache, None s'il n'y en a pas.
+        """
+        try:
+            return tuple(json.loads((self.cache_dir / key / "meta.json").read_text(encoding="utf-8"))["boundaries"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def get(self, key: str, boundaries: tuple) -> CachedSheetBlock:
+        """
+        Bloc en cache contenant le rectangle boundaries, None sinon.
+        """
+        entry = self.cache_dir / key
+        try:
+            meta = json.loads((entry / "meta.json").read_text(encoding="utf-8"))
+            block = CachedSheetBlock(*meta["boundaries"])
+            if not block.contains(boundaries):
+                return None
+            block.kinds = np.load(entry / "kinds.npy", mmap_mode="r")
+            block.nums = np.load(entry / "nums.npy", mmap_mode="r")
+            block.strings = json.loads((entry / "strings.json").read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Entrée du cache Excel illisible {entry}: {e}")
+            return None
+        try:
+            os.utime(entry) # cf. prune
+        except OSError:
+            pass
+        return block
+
+    def put(self, key: str, block: SheetBlock):
+        """
+        Enregistre le bloc (remplace l'entrée existante).
+        """
+        strings = {}
+        shape = (block.n_rows, block.n_cols) # block.values complétées à cette forme (cf. SheetBlock.fill)
+        kinds = np.zeros(shape, dtype=np.int8)
+        nums = np.zeros(shape, dtype=np.float64)
+        for i, row in enumerate(block.values):
+            for j, value in enumerate(row):
+                kinds[i, j], nums[i, j] = _encode(value, strings)
+        entry = self.cache_dir / key
+        tmp = self.cache_dir / f".{key}.{uuid.uuid4().hex}"
+        try:
+            tmp.mkdir(parents=True)
+            np.save(tmp / "kinds.npy", kinds)
+            np.save(tmp / "nums.npy", nums)
+            (tmp / "strings.json").write_text(json.dumps(list(strings)), encoding="utf-8")
+            (tmp / "meta.json").write_text(json.dumps({
+                "boundaries": [block.min_col, block.min_row, block.max_col, block.max_row],
+            }), encoding="utf-8")
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        except OSError as e:
+            # Entrée écrite simultanément par un autre rendu, disque plein, ...
+            logger.warning(f"Impossible d'enregistrer le bloc Excel dans le cache {entry}: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self.prune()
+
+    def prune(self):
+        """
+        Supprime les entrées les moins récemment utilisées au-delà de max_entries.
+        """
+        try:
+            entries = [p for p in self.cache_dir.iterdir() if p.is_dir() and not p.name.startswith(".")]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        for p in entries[:len(entries) - self.max_entries]:
+            shutil.rmtree(p, ignore_errors=True)
@@ -3,35 +3,51 @@ from dataclasses import dataclass, field
 from itertools import chain
 from pathlib import Path
 from typing import Iterator, List
+from docgen.document import Document
 from docgen.outputs.abstract import AbstractOutput
 from docgen.outputs.descriptor import OutputPathDescriptor
 from docgen.outputs.excel import ExcelImgOutput, ExcelOutput, ExcelMarkdownOutput
 from docgen.outputs.img_copy import ImgCopy
-from docgen.regular_expressions import DynotecRegularExpressions
+from docgen.utils.path import write_if_changed
+
+
+# Classe d'output associée à chaque type de référence d'un document
+OUTPUT_CLASSES = {
+    "excel_img": ExcelImgOutput,
+    "excel_table": ExcelMarkdownOutput,
+    "image": ImgCopy,
+}
 
 
 @dataclass
 class OutputsContainer:
     _instances:dict[Path, List[AbstractOutput]] = field(default_factory=dict)
+    _documents:dict[Path, Document] = field(default_factory=dict)
     source_dir: Path = None
     build_dir: Path = None
+    excel_workers: int = 1 # processus pour l'extraction des classeurs (cf. ExcelOutput.build_in_pool)
+    formats: list[str] = None # formats rendus, pour les variantes d'images (cf. ImgCopy.transcode)
 
     def add(self, output: AbstractOutput):
         output.container = self
         self._instances.setdefault(output.content_path, []).append(output)
 
+    def feed_from_document(self,document:Document):
+        """
+        Ajoute les outputs des références du document. Le document sera écrit par run().
+        """
+        self._documents[document.path] = document
+        for reference in document.references:
+            ocls = OUTPUT_CLASSES.get(reference.kind)
+            if ocls is None:
+                continue
+            self.add(ocls(
+                rematch=reference.match,
+                content_path=document.path,
+            ))
+
     def feed_from_content(self,content:str,path:Path):
-        for ocls,reg in [
-            (ExcelImgOutput, DynotecRegularExpressions.excel_img_syntax),
-            (ExcelMarkdownOutput, DynotecRegularExpressions.excel_table_syntax),
-            (ImgCopy, DynotecRegularExpressions.path_in_img)
-        ]:
-            for match in reg.finditer(content):
-                o = ocls(
-                    rematch=match,
-                    content_path=path,
-                )
-                self.add(o)
+        self.feed_from_document(Document.scan(content, path))
 
     @contextmanager
     def executor(self):
@@ -43,21 +59,55 @@ class OutputsContainer:
         for outputs in self._instances.values():
             yield from outputs
 
+    def dependencies(self)->set[Path]:
+        """
+        Fichiers (classeurs, images) lus lors de la construction des outputs.
+        """
+        return set(chain.from_iterable(output.dependencies for output in self.outputs()))
+
+    def dependencies_by_content(self)->dict[Path, set[Path]]:
+        """
+        Fichiers (classeurs, images) lus lors de la construction des outputs, par fichier markdown.
+        """
+        return {
+            content_path: set(chain.from_iterable(output.dependencies for output in outputs))
+            for content_path, outputs in self._instances.items()}
+
+    def includes_by_content(self)->dict[Path, list[str]]:
+        """
+        Chemins inclus par les textes de substitution des outputs, par fichier markdown.
+        """
+        return {
+            content_path: list(chain.from_iterable(output.includes() for output in outputs))
+            for content_path, outputs in self._instances.items()}
+
     def run(self):
         """
-        Process les outputs par content_path, match.position décroissant
+        Prépare les outputs, planifie les extractions Excel, construit les outputs,
+        puis substitue les références de chaque document en une passe (cf. Document.rewrite)
+        et écrit le document s'il a changé.
         """
         
         with self.executor():
-            for output in self.outputs():
+            outputs = list(self.outputs())
+            for output in outputs:
+                output.prepare()
+            img_outputs = [output for output in outputs if isinstance(output, ImgCopy)]
+            ImgCopy.ingest(img_outputs)
+            ImgCopy.transcode(img_outputs, self.formats, self.build_dir)
+            # Références Excel identiques construites une seule fois
+            excel_outputs = ExcelOutput.deduplicate([output for output in outputs if isinstance(output, ExcelOutput)])
+            if self.excel_workers > 1:
+                ExcelOutput.build_in_pool(excel_outputs, self.excel_workers)
+            # Extractions Excel restantes regroupées par classeur et feuille
+            ExcelOutput.plan(excel_outputs)
+            for output in ExcelOutput.by_workbook(excel_outputs):
                 output.build()
-
-        for content_path in self._instances.keys():
-            # TODO : non robuste si des matches se chevauchent, tout casse
-            self._instances[content_path].sort(key=lambda x: x.rematch.start(), reverse=True)  # Tri par position de match décroissante
-        
-        for content_path,outputs in self._instances.items():
-            content = content_path.read_text(encoding="utf-8")
+            # Autres outputs ; les outputs Excel déjà construits ne calculent que leur substitution
             for output in outputs:
-                content = content[:output.rematch.start()] + output.sub_by + content[output.rematch.end():]
-            content_path.write_text(content, encoding="utf-8")
+                output.build()
+
+        for content_path,document in self._documents.items():
+            content = document.rewrite([(output.rematch.start(), output.rematch.end(), output.sub_by)
+                                        for output in self._instances.get(content_path, [])])
+            write_if_changed(content_path, content)
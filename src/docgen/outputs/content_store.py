@@ -0,0 +1,54 @@
+import logging
+from pathlib import Path
+
+from docgen.settings import settings
+from docgen.utils.transfer import COPY, HARDLINK, Transfer
+
+logger = logging.getLogger(__name__)
+
+
+class ContentStore:
+    """
+    Magasin de fichiers adressé par contenu, partagé entre les projets (sous settings.dynotec_home) :
+    chaque contenu n'y est stocké qu'une fois, sous son empreinte sha256.
+
+    Les fichiers des build_dir sont liés aux blobs du magasin (hardlink, reflink, à défaut copie) :
+    une même image référencée depuis plusieurs emplacements ou plusieurs projets n'est pas dupliquée.
+    Comme tout fichier transféré (cf. Transfer), un fichier lié ne doit pas être modifié en place.
+    """
+
+    def __init__(self, root: Path = None):
+        self.root = Path(root or settings.dynotec_home / "store" / "blobs")
+        strategies = settings.get_transfer_strategies()
+        # Le blob ne doit pas partager son contenu avec la source, modifiable en place par l'utilisateur
+        self._ingest = Transfer(strategies=[s for s in strategies if s != HARDLINK] or [COPY])
+        self._link = Transfer(strategies=strategies)
+
+    def blob_path(self, digest: str, suffix: str = "") -> Path:
+        return self.root / digest[:2] / f"{digest}{suffix.lower()}"
+
+    def add(self, src: Path, digest: str) -> Path:
+        """
+        Ajoute le contenu de src (d'empreinte digest) au magasin s'il n'y est pas, retourne son blob.
+        """
+        blob = self.blob_path(digest, Path(src).suffix)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            self._ingest.copy(src, blob)
+            logger.debug(f"Ajout au magasin : {src} -> {blob}")
+        return blob
+
+    def materialize(self, src: Path, digest: str, dest: Path) -> str:
+        """
+        Place le contenu de src (d'empreinte digest) en dest, lié au blob du magasin.
+
+        Returns:
+            str: la stratégie de transfert retenue, None si dest était déjà à jour
+        """
+        blob = self.add(src, digest)
+        dest = Path(dest)
+        if dest.exists() and dest.stat().st_size == blob.stat().st_size:
+            # dest est nommé d'après l'empreinte de son contenu
+            return None
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        return self._link.copy(blob, dest)
@@ -1,9 +1,10 @@
 
 
 from dataclasses import asdict, dataclass, field
+import hashlib
 from pathlib import Path
 import re
-from typing import ClassVar, Self
+from typing import Self
 
 from docgen.outputs import GENERATED_PATH_IN_BUILD_DIR
 from docgen.utils.path import resolve_path
@@ -22,21 +23,18 @@ class OutputPathDescriptor:
     absolute_new_stem: Path = None # New path in the dest directory
     relative_new_stem: Path = None # New path relative to the dest directory
 
-
-    n_called: int = 0
-
     is_generated: bool = False
 
-    _new_path_counter: ClassVar[dict] = {}
-
     @classmethod
-    def next_path(cls,dest_dir)->Path:
+    def next_path(cls,absolute_path:Path)->Path:
         """
-        Returns the next path to be used in the build directory.
+        Returns the path to be used in the build directory for absolute_path.
+
+        Le chemin est dérivé de l'empreinte du chemin source : il est identique d'un rendu à l'autre
+        et d'un Renderer à l'autre, quel que soit l'ordre de parcours des documents.
         """
-        cls._new_path_counter.setdefault(dest_dir, 0)
-        cls._new_path_counter[dest_dir] = cls._new_path_counter[dest_dir]  + 1
-        return Path(".") / GENERATED_PATH_IN_BUILD_DIR / f"auto_{cls._new_path_counter[dest_dir]}_"
+        digest = hashlib.sha256(Path(absolute_path).as_posix().encode("utf-8")).hexdigest()[:16]
+        return Path(".") / GENERATED_PATH_IN_BUILD_DIR / f"{digest}_"
 
     @classmethod
     def from_string(cls, s: str|Path,source_dir,dest_dir,force_generation: bool=False)-> Self:
@@ -56,7 +54,7 @@ class OutputPathDescriptor:
         if absolute_path.is_file():
             to_test  = absolute_path.parent
         if to_test < source_dir or force_generation:
-            result.relative_new_stem = cls.next_path(dest_dir)
+            result.relative_new_stem = cls.next_path(absolute_path)
             result.absolute_new_stem= resolve_path(result.relative_new_stem,relative_to=dest_dir)
             result.is_generated = True
         else:
@@ -1,12 +1,22 @@
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
+import difflib
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import ClassVar
 
 from docgen.outputs.abstract import AbstractOutput
+from docgen.outputs.block_cache import SheetBlockCache
 from docgen.outputs.descriptor import OutputPathDescriptor
-from docgen.utils.path import has_been_modified, hash_path,sanitize_path_part
+from docgen.outputs.fingerprint import Fingerprint
+from docgen.outputs.plan import ExtractionPlan, SheetBlock
+from docgen.outputs.readers import ExcelReader, OpenpyxlReader, complete_rows, get_reader_class
+from docgen.settings import settings
+from docgen.utils.hashing import file_state, fingerprint
+from docgen.utils.path import hash_path,sanitize_path_part,write_if_changed
 from docgen.utils.table import to_quarto_markdown
+from docgen.utils.lru import MemoryBoundedLRU
+from docgen.utils.xlsx import SHARED_STRINGS_XML, STYLES_XML, WorkbookIndex, member_sizes, sheet_signature, workbook_index
 import openpyxl
 import pandas as pd
 try:
@@ -15,7 +25,7 @@ try:
 except ImportError:
     xw = None
     windll = None
-from openpyxl.utils import range_to_tuple
+from openpyxl.utils import get_column_letter, range_boundaries
 from PIL import ImageGrab
 import logging
 
@@ -77,9 +87,13 @@ class CoreExcelOutput:
     _range_str: str = field(init=False,default=None)
     _sheet_name:str = field(init=False,default=None)
     _outname:str = field(init=False,default=None)
+    _block: SheetBlock = field(init=False,default=None,repr=False) # valeurs lues par ExtractionPlan
+    _rows: list = field(init=False,default=None,repr=False)
 
 
-    _workbook_cache: ClassVar[dict] = {}
+    # Classeurs openpyxl (lecture seule, complets) et lecteurs ouverts, par (type, chemin)
+    _workbook_cache: ClassVar[MemoryBoundedLRU] = MemoryBoundedLRU(
+        budget=settings.excel_cache_memory_mb * 2**20, close=lambda value: value.close())
     _xw_cache: ClassVar[XwCache] = XwCache()
 
     def __post_init__(self):
@@ -89,17 +103,39 @@ class CoreExcelOutput:
 
         self._parse_range(self.range_name)
 
-        self._outname = sanitize_path_part(self._wbname + "_" + self._range_str).lower()
+        # Nom dérivé de la plage résolue : identique quelle que soit l'écriture de la plage (nom défini, ...)
+        self._outname = sanitize_path_part(self._wbname + "_" + self._canonical_range_str()).lower()
+
+    def _canonical_range_str(self) -> str:
+        if None in self._range_boudaries:
+            return self._range_str
+        min_col, min_row, max_col, max_row = self._range_boudaries
+        return f"{self._sheet_name}!{get_column_letter(min_col)}{min_row}_{get_column_letter(max_col)}{max_row}"
 
     @classmethod
     def clear_caches(cls):
         cls._xw_cache.close_books()
-        for wb in cls._workbook_cache.values():
-            try:
-                wb.close()
-            except Exception as e:
-                logger.warning(f"Error closing workbook: {e}")
+        if cls._workbook_cache.misses:
+            logger.info(f"Cache des classeurs : {cls._workbook_cache.stats()}")
         cls._workbook_cache.clear()
+        cls._workbook_cache.hits = cls._workbook_cache.misses = cls._workbook_cache.evictions = 0
+
+    def _estimate_memory(self, kind: str) -> int:
+        """
+        Mémoire estimée d'un classeur ouvert, d'après la taille décompressée des membres de l'archive :
+        - lecture seule openpyxl : chaînes partagées et styles chargés, feuilles lues à la demande,
+        - chargement complet : toutes les cellules en objets Python,
+        - autres lecteurs : chaînes partagées lues au plus.
+        """
+        sizes = member_sizes(self.wb_path)
+        if not sizes:
+            return self.wb_path.stat().st_size * 10
+        strings = sizes.get(SHARED_STRINGS_XML, 0) * 2
+        if kind == "read_only":
+            return strings + sizes.get(STYLES_XML, 0) * 5
+        if kind == "full":
+            return sum(sizes.values()) * 5
+        return strings
 
     @property
     def xw_wb(self):
@@ -113,78 +149,235 @@ class CoreExcelOutput:
     
     @property
     def wb(self):
-        """Load workbook using openpyxl"""
-        if self.wb_path_str not in self._workbook_cache:
-            self._workbook_cache[self.wb_path_str] = openpyxl.load_workbook(self.wb_path)
-        return self._workbook_cache[self.wb_path_str]
+        """
+        Load workbook using openpyxl.
+
+        En lecture seule (settings.excel_read_only) : les feuilles sont lues à la demande, ligne à ligne,
+        sans styles, et les formules sont remplacées par leur dernière valeur calculée.
+        """
+        if not settings.excel_read_only:
+            return self.wb_full
+        return self._workbook_cache.get(
+            ("read_only", self.wb_path_str),
+            load=lambda: openpyxl.load_workbook(self.wb_path, read_only=True, data_only=True),
+            estimate=lambda: self._estimate_memory("read_only"))
+
+    @property
+    def wb_full(self):
+        """
+        Load the whole workbook using openpyxl, seulement pour les fonctionnalités non disponibles en lecture seule.
+        """
+        def load():
+            logger.debug(f"Chargement complet du classeur {self.wb_path}")
+            return openpyxl.load_workbook(self.wb_path, data_only=True)
+        return self._workbook_cache.get(("full", self.wb_path_str), load=load,
+                                        estimate=lambda: self._estimate_memory("full"))
+
+    @property
+    def reader(self) -> ExcelReader:
+        """
+        Lecteur des valeurs du classeur (settings.excel_reader) ; le lecteur openpyxl
+        utilise le classeur chargé par wb, dans le cache des classeurs.
+        """
+        reader_class = get_reader_class(settings.excel_reader)
+        if issubclass(reader_class, OpenpyxlReader):
+            return reader_class(self.wb_path, workbook=self.wb)
+        return self._workbook_cache.get((reader_class.name, self.wb_path_str),
+                                        load=lambda: reader_class(self.wb_path),
+                                        estimate=lambda: self._estimate_memory(reader_class.name))
 
     @property
     def sh(self):
         """Get worksheet"""
         return self.wb[self._sheet_name]
 
+    @property
+    def index(self) -> WorkbookIndex:
+        """Métadonnées du classeur : feuilles, noms définis, tableaux"""
+        return workbook_index(self.wb_path)
+
     def _parse_range(self, range_str):
-        """Parse Excel range string to get cell boundaries"""
-        if self._range_boudaries is None:
-            try:
-                self._sheet_name,self._range_boudaries = range_to_tuple(range_str)
-                self._range_str=range_str
-            except ValueError as e:
-                pass
-        if self._range_boudaries is None:
-            try:
-                self._range_boudaries = self._parse_range(f"{self.wb.sheetnames[0]}!{range_str}")
-                if len(self.wb.sheetnames)>1:
-                    logger.warning(f"Aucune feuille définie, {self._sheet_name} retenue")
-            except ValueError as e:
-                pass
-        if self._range_boudaries is None:
-            _ = self.sh.defined_names.get(range_str)
-            if _ is None:
-                _ = self.wb.defined_names.get(range_str)
-            if _ is not None:
-                g = iter(_.destinations)
-                sheet_name,range_ = next(g)
-                self._range_boudaries = self._parse_range(f"{sheet_name}!{range_}")
-                if next(g,None) is not None:
-                    raise ValueError("Les plages multidestinations ne sont pas supportées")
-        if self._range_boudaries is None:
-            raise ValueError(f"Invalid range: {range_str}")
+        """
+        Parse Excel range string to get cell boundaries.
+
+        La résolution utilise l'index des métadonnées du classeur (cf. WorkbookIndex), sans le charger :
+        noms définis (de la feuille si elle est précisée, du classeur sinon), tableaux Excel, puis plage
+        de cellules. Sans feuille précisée, une plage de cellules désigne la première feuille.
+        """
+        index = self.index
+        sheet_name, ref = None, range_str
+        if "!" in range_str:
+            sheet_part, ref = range_str.rsplit("!", 1)
+            sheet_name = index.sheet(sheet_part.strip("'").replace("''", "'"))
+            if sheet_name is None:
+                raise ValueError(self._invalid_range_message(range_str, sheet_part, index))
+        self._range_str = range_str if sheet_name is not None else None
+
+        formula = index.defined_name(ref, sheet_name)
+        if formula is None and sheet_name is not None:
+            formula = index.defined_name(ref)
+        if formula is None and sheet_name is None and len(scoped := index.scoped_defined_names(ref)) == 1:
+            # Nom défini au niveau d'une seule feuille
+            formula = scoped[0]
+        if formula is not None:
+            destinations = index.destinations(formula)
+            if len(destinations) > 1:
+                raise ValueError("Les plages multidestinations ne sont pas supportées")
+            if not destinations or index.sheet(destinations[0][0]) is None:
+                raise ValueError(f"Le nom {ref} ne désigne pas une plage de cellules : {formula}")
+            sheet_name, ref = index.sheet(destinations[0][0]), destinations[0][1]
+            self._range_str = None
+        elif (table := index.table(ref)) is not None and sheet_name in (None, table[0]):
+            sheet_name, ref = table
+            self._range_str = None
+
+        if sheet_name is None:
+            sheet_name = next(iter(index.sheets))
+            if len(index.sheets) > 1:
+                logger.warning(f"Aucune feuille définie, {sheet_name} retenue")
+        try:
+            boundaries = range_boundaries(ref)
+        except (ValueError, TypeError):
+            raise ValueError(self._invalid_range_message(range_str, ref, index))
+        if None in boundaries and (dimension := index.dimension(sheet_name)) is not None:
+            # Colonnes ou lignes entières : limitées à la plage utilisée de la feuille
+            boundaries = tuple(b if b is not None else d for b, d in zip(boundaries, range_boundaries(dimension)))
+
+        self._sheet_name = sheet_name
+        self._range_boudaries = boundaries
+        if self._range_str is None:
+            self._range_str = f"{sheet_name}!{ref.replace('$', '')}"
         return self._range_boudaries
 
+    @staticmethod
+    def _invalid_range_message(range_str: str, name: str, index: WorkbookIndex) -> str:
+        message = f"Invalid range: {range_str}"
+        suggestions = difflib.get_close_matches(name, index.names(), n=3, cutoff=0.6)
+        if not suggestions:
+            suggestions = difflib.get_close_matches(name.casefold(), index.names(), n=3, cutoff=0.6)
+        if suggestions:
+            message += f" (noms proches dans le classeur : {', '.join(suggestions)})"
+        return message
+
+    def _get_range_rows(self)->list[list]:
+        """
+        Extract values from Excel range, row by row (read once).
+
+        Toutes les lignes de la plage sont retournées, y compris celles au-delà de la fin de la feuille
+        (comme lors du chargement complet du classeur).
+        """
+        if self._rows is None:
+            min_col, min_row, max_col, max_row = self._range_boudaries
+            if self._block is not None:
+                rows = self._block.slice(self._range_boudaries)
+            else:
+                rows = self.reader.iter_rows(self._sheet_name, min_row=min_row, max_row=max_row,
+                                             min_col=min_col, max_col=max_col)
+            if None in self._range_boudaries:
+                # Plage non bornée sans dimension de feuille connue : lignes lues
+                self._rows = list(rows)
+            else:
+                self._rows = complete_rows(rows, max_row - min_row + 1, max_col - min_col + 1)
+        return self._rows
+
     def _get_range_values(self)->pd.DataFrame:
         """Extract values from Excel range"""
+        return pd.DataFrame(self._get_range_rows())
+
+    def _get_range_formats(self)->list[list]:
+        """Formats des cellules de la plage (format de nombre, police, remplissage, bordures, alignement)"""
         min_col, min_row, max_col, max_row = self._range_boudaries
-        values = []
-        for row in self.sh.iter_rows(min_row=min_row, max_row=max_row, 
-                                     min_col=min_col, max_col=max_col, values_only=True):
-            values.append(list(row))
-        return pd.DataFrame(values)
+        attrs = ("number_format", "font", "fill", "border", "alignment")
+        return [[tuple(repr(getattr(cell, attr, None)) for attr in attrs) for cell in row]
+                for row in self.sh.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col)]
+
+    def content_digest(self,mode="paragraph",**kwargs)->str:
+        """
+        Empreinte du contenu de l'output : valeurs de la plage, et formats pour les images.
+        """
+        parts = [mode, sorted(kwargs.items()), self._get_range_rows()]
+        if mode == "image":
+            parts.append(self._get_range_formats())
+        return fingerprint(*parts)
     
-    def build(self,mode="paragraph",parent_path:Path=None,**kwargs)->Path:
+    def output_path(self,mode="paragraph",parent_path:Path=None)->Path:
         """
-        Build the output based on the specified mode only if the file has been modified.
+        Chemin de l'output pour le mode spécifié.
         """
         if parent_path is None:
             parent_path = self.wb_path.parent
         path = (parent_path / self._outname)
         if mode == "paragraph":
-            path = path.with_suffix(".txt")
-            f= self.build_paragraph
+            return path.with_suffix(".txt")
         elif mode == "image":
-            path = path.with_suffix(".png")
-            f = self.build_image
+            return path.with_suffix(".png")
         elif mode == "html":
-            path = path.with_suffix(".html")
-            f = self.build_html
+            return path.with_suffix(".html")
         elif mode in ["markdown","quarto_markdown"]:
-            path = path.with_suffix(".md")
-            f = self.build_markdown if mode == "markdown" else self.build_quarto_markdown
-        else:
-            raise ValueError(f"Mode {mode} non supporté. Utiliser 'paragraph', 'image' ou 'html'.")
-        if has_been_modified(self.wb_path, path, hash=False):
+            return path.with_suffix(".md")
+        raise ValueError(f"Mode {mode} non supporté. Utiliser 'paragraph', 'image' ou 'html'.")
+
+    def zip_signature(self)->list:
+        """
+        Signature des parties du classeur (archive zip) dont dépend l'output, cf. sheet_signature.
+        """
+        return sheet_signature(self.wb_path, self._sheet_name)
+
+    def is_up_to_date(self,fingerprint:Fingerprint)->bool:
+        """
+        Vérifications préalables à toute lecture du classeur par openpyxl :
+        - le classeur n'a pas changé depuis la dernière vérification,
+        - sinon, les parties de l'archive lues pour l'output sont identiques (CRC32 et taille) :
+          le classeur a seulement été enregistré à nouveau.
+        """
+        if fingerprint.is_fresh(self.wb_path):
+            return True
+        if not fingerprint.output_path.exists() or fingerprint.content_digest is None:
+            return False
+        source_state = file_state(self.wb_path)
+        signature = self.zip_signature()
+        if signature is None or signature != fingerprint.extra.get("zip_signature"):
+            return False
+        fingerprint.source_state = source_state
+        fingerprint.save()
+        return True
+
+    def needs_build(self,mode="paragraph",parent_path:Path=None)->bool:
+        """
+        False si l'output existe et que le contenu lu pour lui dans le classeur n'a pas changé.
+        """
+        return not self.is_up_to_date(Fingerprint.load(self.output_path(mode, parent_path)))
+
+    def build(self,mode="paragraph",parent_path:Path=None,**kwargs)->Path:
+        """
+        Build the output based on the specified mode only if the range content has been modified.
+
+        Si les parties de l'archive lues pour l'output ont changé (cf. is_up_to_date), l'empreinte du contenu de la plage
+        est comparée à celle de l'output (cf. Fingerprint) : l'output n'est réécrit que si elle diffère.
+        """
+        path = self.output_path(mode, parent_path)
+        f = {
+            "paragraph": self.build_paragraph,
+            "image": self.build_image,
+            "html": self.build_html,
+            "markdown": self.build_markdown,
+            "quarto_markdown": self.build_quarto_markdown,
+        }[mode]
+        fingerprint = Fingerprint.load(path)
+        if self.is_up_to_date(fingerprint):
+            return path
+        source_state = file_state(self.wb_path) # avant lecture : une modification pendant la lecture sera revue
+        zip_signature = self.zip_signature()
+        content_digest = self.content_digest(mode, **kwargs)
+        if content_digest != fingerprint.content_digest or not path.exists():
             f(path,**kwargs)
             logger.info(f"Output créé: {path}")
+        else:
+            logger.debug(f"Output inchangé: {path}")
+        fingerprint.source_state = source_state
+        fingerprint.content_digest = content_digest
+        fingerprint.extra["zip_signature"] = zip_signature
+        fingerprint.save()
         return path
 
     def build_paragraph(self,path:Path):
@@ -195,7 +388,7 @@ class CoreExcelOutput:
         _ = _.str.cat(sep="\n")
         # _ = _[_ != '']  # Supprimer les lignes vides
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(_, encoding="utf8")
+        write_if_changed(path, _, encoding="utf8")
     
     def build_image(self,path:Path):
         if windll is None or xw is None:
@@ -213,7 +406,7 @@ class CoreExcelOutput:
         kwargs.setdefault("header", False)
         kwargs.setdefault("index", False)
         kwargs.setdefault("table_id", self._outname)
-        plage.to_html(path,**kwargs)
+        write_if_changed(path, plage.to_html(**kwargs), encoding="utf8")
 
     def build_quarto_markdown(self, path: Path, **kwargs):
         """
@@ -222,17 +415,22 @@ class CoreExcelOutput:
         kwargs.setdefault("table_id", self._outname)
         markdown_content = to_quarto_markdown(self._get_range_values(), **kwargs)
         path.parent.mkdir(parents=True, exist_ok=True)
-        path.write_text(markdown_content, encoding="utf8")
+        write_if_changed(path, markdown_content, encoding="utf8")
     
     def build_markdown(self,path:Path,**kwargs):
         plage = self._get_range_values()
         kwargs.setdefault("index", self.with_rows)
         kwargs.setdefault("tablefmt","grid")
-        plage.to_markdown(path,**kwargs)
+        write_if_changed(path, plage.to_markdown(**kwargs), encoding="utf8")
 
 @dataclass
 class ExcelOutput(AbstractOutput):
-    
+    mode: ClassVar[str] = "paragraph" # mode de CoreExcelOutput.build
+    core_out: CoreExcelOutput = field(default=None,init=False)
+    dest: Path = field(default=None,init=False)
+    result: Path = field(default=None,init=False) # output construit (éventuellement par un processus du pool)
+    shared: 'ExcelOutput' = field(default=None,init=False,repr=False) # output identique construit à la place de celui-ci
+
     @classmethod
     @contextmanager
     def executor(cls):
@@ -241,7 +439,78 @@ class ExcelOutput(AbstractOutput):
         finally:
             CoreExcelOutput.clear_caches()
 
-    def build(self):
+    @property
+    def key(self) -> tuple:
+        """
+        Identité de l'output construit : classeur, plage résolue, mode et dossier.
+        """
+        return (self.core_out.wb_path_str, self.core_out._sheet_name, self.core_out._range_boudaries,
+                self.mode, self.dest)
+
+    @classmethod
+    def deduplicate(cls, outputs: list['ExcelOutput']) -> list['ExcelOutput']:
+        """
+        Les outputs identiques (cf. key), d'un même document ou non, pointent vers un seul output
+        construit : celui de leur première occurrence. Retourne les outputs à construire.
+        Les outputs doivent avoir été préparés.
+        """
+        unique = {}
+        for output in outputs:
+            first = unique.setdefault(output.key, output)
+            if first is not output:
+                output.shared = first
+                output.core_out = first.core_out
+        if len(unique) < len(outputs):
+            logger.info(f"{len(outputs) - len(unique)} référence(s) Excel en double, {len(unique)} output(s) à construire")
+        return list(unique.values())
+
+    @staticmethod
+    def by_workbook(outputs: list['ExcelOutput']) -> list['ExcelOutput']:
+        """
+        Outputs triés par classeur (ordre stable) : toutes les plages d'un classeur sont consommées
+        avant qu'il ne soit évincé du cache des classeurs.
+        """
+        return sorted(outputs, key=lambda output: output.core_out.wb_path_str)
+
+    @classmethod
+    def plan(cls, outputs: list['ExcelOutput']):
+        """
+        Lit en une passe par feuille les valeurs des outputs à construire (cf. ExtractionPlan).
+        Les outputs doivent avoir été préparés.
+        """
+        plan = ExtractionPlan(cache=SheetBlockCache() if settings.excel_block_cache else None)
+        for output in outputs:
+            # Le mode image copie la plage depuis Excel : pas de lecture des valeurs
+            if output.result is None and output.mode != "image" and output.core_out.needs_build(output.mode, output.dest):
+                plan.add(output.core_out)
+        plan.execute()
+
+    @classmethod
+    def build_in_pool(cls, outputs: list['ExcelOutput'], max_workers: int):
+        """
+        Construit les outputs dans un pool de processus, un job par classeur (cf. build_workbook_outputs) :
+        la lecture des classeurs par openpyxl est limitée par le CPU.
+        Les images, copiées depuis Excel, restent construites dans le processus principal.
+        Les outputs doivent avoir été préparés.
+        """
+        by_workbook = {}
+        for output in outputs:
+            if output.mode != "image":
+                by_workbook.setdefault(output.core_out.wb_path_str, []).append(output)
+        if len(by_workbook) < 2:
+            return
+        logger.info(f"Extraction de {len(by_workbook)} classeurs dans {min(max_workers, len(by_workbook))} processus")
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(by_workbook))) as pool:
+            futures = {
+                pool.submit(build_workbook_outputs,
+                            [(o.core_out.wb_path_str, o.core_out.range_name, o.mode, str(o.dest))
+                             for o in wb_outputs]): wb_outputs
+                for wb_outputs in by_workbook.values()}
+            for future, wb_outputs in futures.items():
+                for output, result in zip(wb_outputs, future.result()):
+                    output.result = Path(result)
+
+    def prepare(self):
         label = self.rematch.group(1).strip()
         excel_path = self.rematch.group(2).strip()
         descr = OutputPathDescriptor.from_string(excel_path,
@@ -255,24 +524,42 @@ class ExcelOutput(AbstractOutput):
             descr.absolute_path,
             range_name=excel_range,
         )
+        self.dependencies.append(self.core_out.wb_path)
+
+    def build(self):
+        if self.core_out is None:
+            self.prepare()
+        if self.result is None and self.shared is not None:
+            if self.shared.result is None:
+                self.shared.build()
+            self.result = self.shared.result
+        if self.result is None:
+            self.result = self.core_out.build(mode=self.mode, parent_path=self.dest)
+        self.substitute(self.result.relative_to(self.container.build_dir))
+
+    def substitute(self, result: Path):
+        """
+        Texte de substitution pour l'output construit result (relatif au build_dir).
+        """
+        self.sub_by = str(result)
 
 
 class ExcelImgOutput(ExcelOutput):
     """
     Output pour les images Excel.
     """
-    def build(self):
-        super().build()
-        result = self.core_out.build(mode="image", parent_path=self.dest)
-        result = result.relative_to(self.container.build_dir)
+    mode: ClassVar[str] = "image"
+
+    def substitute(self, result: Path):
         self.sub_by = f"![{self.label}]({str(result)})"
     
 class ExcelMarkdownOutput(ExcelOutput):
     """
     Output pour les tableaux Excel.
     """
-    def build(self):
-        super().build()
+    mode: ClassVar[str] = "quarto_markdown"
+
+    def substitute(self, result: Path):
         # Approche Markdown
 #         result = self.core_out.build(mode="markdown", parent_path=self.dest)
 #         content = result.read_text(encoding="utf8")
@@ -281,12 +568,32 @@ class ExcelMarkdownOutput(ExcelOutput):
 # : {self.label} {{.striped .hover}}
 # """,encoding="utf8")
 
-        # Approche quarto_markdown (via html)
-        result = self.core_out.build(mode="quarto_markdown", parent_path=self.dest)
-        
-        # Common
-        result = result.relative_to(self.container.build_dir)
-        self.sub_by = "{{"+f"< include {str(result)} >"+"}}"
+        # Approche quarto_markdown (via html) : cf. mode
+        self.included = str(result)
+        self.sub_by = "{{"+f"< include {self.included} >"+"}}"
+
+    def includes(self) -> list[str]:
+        return [self.included]
+
+
+def build_workbook_outputs(tasks: list[tuple[str, str, str, str]]) -> list[str]:
+    """
+    Job d'un processus du pool (cf. ExcelOutput.build_in_pool) : construit les outputs
+    (wb_path, range_name, mode, parent_path) d'un même classeur, retourne leurs chemins.
+    """
+    try:
+        core_outs = [(CoreExcelOutput(wb_path, range_name=range_name), mode, Path(parent_path))
+                     for wb_path, range_name, mode, parent_path in tasks]
+        plan = ExtractionPlan(cache=SheetBlockCache() if settings.excel_block_cache else None)
+        for core_out, mode, parent_path in core_outs:
+            if core_out.needs_build(mode, parent_path):
+                plan.add(core_out)
+        plan.execute()
+        return [str(core_out.build(mode=mode, parent_path=parent_path))
+                for core_out, mode, parent_path in core_outs]
+    finally:
+        # Caches propres au processus
+        CoreExcelOutput.clear_caches()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+from dataclasses import dataclass, field
+import json
+import logging
+from pathlib import Path
+
+from docgen.utils.hashing import file_state
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_SUFFIX = ".fingerprint"
+
+
+@dataclass
+class Fingerprint:
+    """
+    Empreinte d'un output généré, enregistrée à côté de lui (<output>.fingerprint) :
+    état de la source (classeur) lors de la dernière vérification et empreinte du contenu extrait.
+
+    Un output n'est réécrit que si l'empreinte de son contenu change : sa date de modification
+    reste stable quand d'autres plages du classeur sont modifiées.
+    """
+    output_path: Path
+    source_state: list[int] = None
+    content_digest: str = None
+    extra: dict = field(default_factory=dict) # informations propres au type d'output
+
+    @property
+    def path(self) -> Path:
+        return self.output_path.with_name(self.output_path.name + FINGERPRINT_SUFFIX)
+
+    @classmethod
+    def load(cls, output_path: Path) -> 'Fingerprint':
+        result = cls(Path(output_path))
+        try:
+            data = json.loads(result.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return result
+        except (OSError, ValueError) as e:
+            logger.warning(f"Empreinte illisible {result.path}: {e}")
+            return result
+        result.source_state = data.get("source_state")
+        result.content_digest = data.get("content_digest")
+        result.extra = data.get("extra", {})
+        return result
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps({
+            "source_state": self.source_state,
+            "content_digest": self.content_digest,
+            "extra": self.extra,
+        }), encoding="utf-8")
+
+    def is_fresh(self, source: Path) -> bool:
+        """
+        True si l'output existe et que la source n'a pas changé depuis la dernière vérification.
+        """
+        return (self.output_path.exists() and self.content_digest is not None
+                and self.source_state == file_state(source))
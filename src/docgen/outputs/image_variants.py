@@ -0,0 +1,236 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+import json
+import logging
+import os
+from pathlib import Path
+import uuid
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from docgen.outputs import GENERATED_PATH_IN_BUILD_DIR
+from docgen.settings import settings
+from docgen.utils.hashing import fingerprint
+from docgen.utils.transfer import Transfer
+from docgen.utils.path import write_if_changed
+
+logger = logging.getLogger(__name__)
+
+# Table image -> variantes par format, lue par le filtre images.lua de l'extension
+VARIANTS_MAPPING = f"{GENERATED_PATH_IN_BUILD_DIR}/image_variants.json"
+VARIANTS_DIR = f"{GENERATED_PATH_IN_BUILD_DIR}/variants"
+
+# Images matricielles pouvant être réduites ou converties
+RASTER_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff", ".gif"}
+
+PRINT_WIDTH_IN = 6.5 # largeur utile d'une page A4/Letter en pouces
+
+
+@dataclass(frozen=True)
+class VariantProfile:
+    """
+    Variante d'image attendue pour un format de sortie.
+
+    Parameters:
+        fmt (str): format de rendu (html, pdf, docx)
+        max_width (int): largeur maximale en pixels
+        accepted (tuple[str]): suffixes d'images acceptés tels quels par le format
+        opaque (str): suffixe de la variante d'une image opaque
+        transparent (str): suffixe de la variante d'une image avec transparence
+    """
+    fmt: str
+    max_width: int
+    accepted: tuple[str, ...]
+    opaque: str
+    transparent: str
+
+    def suffix(self, transparent: bool) -> str:
+        return self.transparent if transparent else self.opaque
+
+
+def profiles(formats: list[str]) -> list[VariantProfile]:
+    """
+    Profils des formats demandés (les formats sans profil, revealjs, ..., gardent l'image d'origine).
+    """
+    available = {
+        "html": VariantProfile("html", settings.image_html_max_width,
+                               (".png", ".jpg", ".jpeg", ".gif", ".webp"), ".webp", ".webp"),
+        "pdf": VariantProfile("pdf", round(settings.image_pdf_dpi * PRINT_WIDTH_IN),
+                              (".png", ".jpg", ".jpeg"), ".jpg", ".png"),
+        "docx": VariantProfile("docx", settings.image_docx_max_width,
+                               (".png", ".jpg", ".jpeg", ".gif"), ".png", ".png"),
+    }
+    return [available[fmt] for fmt in dict.fromkeys(formats or []) if fmt in available]
+
+
+@dataclass
+class SourceImage:
+    """
+    Image référencée par les documents.
+
+    Parameters:
+        key (str): chemin de l'image dans le build_dir, tel que résolu par le filtre images.lua
+        path (Path): fichier lu
+        content_digest (str): empreinte du contenu de path
+    """
+    key: str
+    path: Path
+    content_digest: str
+
+
+class ImageVariantCache:
+    """
+    Cache disque, partagé entre les rendus et les projets, des variantes d'images par format :
+    une image trop large (capture d'écran de 30 mégapixels, ...) ou dans un format non supporté
+    (webp en pdf, ...) est réduite et convertie une seule fois par contenu et par profil.
+
+    Les variantes sont liées (cf. Transfer) dans generated/variants du build_dir, et la table
+    generated/image_variants.json permet au filtre images.lua de les substituer selon le format rendu.
+    Nécessite Pillow (extra `images`), les images sont laissées telles quelles sinon.
+    """
+    VERSION = 1
+
+    _sizes: dict = {} # empreinte du contenu -> (largeur, transparence)
+
+    def __init__(self, cache_dir: Path = None):
+        self.cache_dir = Path(cache_dir or settings.dynotec_home / "cache" / "image_variants")
+        self._link = Transfer(strategies=settings.get_transfer_strategies())
+
+    @classmethod
+    def available(cls) -> bool:
+        return Image is not None
+
+    def key(self, source: SourceImage, profile: VariantProfile) -> str:
+        return fingerprint(self.VERSION, source.content_digest, profile, settings.image_variant_quality)[:32]
+
+    @classmethod
+    def _describe(cls, source: SourceImage) -> tuple[int, bool]:
+        """
+        Largeur et transparence de l'image, lues dans son en-tête.
+        """
+        cached = cls._sizes.get(source.content_digest)
+        if cached is None:
+            with Image.open(source.path) as im:
+                transparent = im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info)
+                animated = getattr(im, "is_animated", False)
+                cached = cls._sizes[source.content_digest] = (None if animated else im.width, transparent)
+        return cached
+
+    def needed(self, source: SourceImage, profiles: list[VariantProfile]) -> dict[str, str]:
+        """
+        Variantes à produire pour l'image : format -> nom du fichier de la variante.
+        """
+        if source.path.suffix.lower() not in RASTER_SUFFIXES:
+            return {}
+        try:
+            width, transparent = self._describe(source)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Image illisible {source.path}, pas de variante : {e}")
+            return {}
+        if width is None: # animation
+            return {}
+        result = {}
+        for profile in profiles:
+            if width <= profile.max_width and source.path.suffix.lower() in profile.accepted:
+                continue
+            result[profile.fmt] = f"{self.key(source, profile)}_{source.path.stem}{profile.suffix(transparent)}"
+        return result
+
+    def _variant(self, source: SourceImage, profile: VariantProfile, name: str) -> Path:
+        """
+        Variante en cache, produite si elle n'y est pas.
+        """
+        cached = self.cache_dir / name[:2] / name
+        if cached.exists():
+            return cached
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cached.with_name(f".{cached.name}.{uuid.uuid4().hex}")
+        try:
+            with Image.open(source.path) as im:
+                im.load()
+                if im.width > profile.max_width:
+                    height = max(1, round(im.height * profile.max_width / im.width))
+                    im = im.resize((profile.max_width, height), Image.Resampling.LANCZOS)
+                suffix = cached.suffix.lower()
+                if suffix == ".jpg":
+                    im.convert("RGB").save(tmp, "JPEG", quality=settings.image_variant_quality, optimize=True,
+                                           dpi=(settings.image_pdf_dpi, settings.image_pdf_dpi))
+                elif suffix == ".webp":
+                    im.save(tmp, "WEBP", quality=settings.image_variant_quality, method=4)
+                else:
+                    if im.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+                        im = im.convert("RGBA")
+                    im.save(tmp, "PNG", optimize=True)
+            os.replace(tmp, cached)
+        finally:
+            try:
+                tmp.unlink()
+            except FileNotFoundError:
+                pass
+        logger.debug(f"Variante {profile.fmt} de {source.path} : {cached}")
+        return cached
+
+    def materialize(self, source: SourceImage, profile: VariantProfile, name: str, build_dir: Path):
+        dest = build_dir / VARIANTS_DIR / name
+        if dest.exists():
+            # Le nom est dérivé du contenu de la source et du profil
+            return
+        cached = self._variant(source, profile, name)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        self._link.copy(cached, dest)
+
+    def run(self, sources: list[SourceImage], formats: list[str], build_dir: Path, max_workers: int = None):
+        """
+        Produit en parallèle les variantes des images pour les formats demandés et met à jour la table
+        des variantes du build_dir.
+        """
+        selected = profiles(formats)
+        if not selected or not sources:
+            return
+        by_fmt = {profile.fmt: profile for profile in selected}
+        sources = list({source.key: source for source in sources}.values())
+        mapping = {}
+        jobs = []
+
+        def plan(source):
+            return source, self.needed(source, selected)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for source, names in pool.map(plan, sources):
+                if names:
+                    mapping[source.key] = {fmt: f"{VARIANTS_DIR}/{name}" for fmt, name in names.items()}
+                    jobs.extend((source, by_fmt[fmt], name) for fmt, name in names.items())
+            errors = []
+            for job, future in [(job, pool.submit(self.materialize, *job, build_dir)) for job in jobs]:
+                try:
+                    future.result()
+                except (OSError, ValueError) as e:
+                    # L'image d'origine est conservée pour ce format
+                    errors.append(job)
+                    logger.warning(f"Variante {job[1].fmt} de {job[0].path} impossible : {e}")
+        for source, profile, _ in errors:
+            mapping[source.key].pop(profile.fmt, None)
+        self.write_mapping(build_dir, mapping, [source.key for source in sources])
+        if jobs:
+            logger.info(f"{len(jobs) - len(errors)} variante(s) d'images pour {','.join(by_fmt)}")
+
+    @staticmethod
+    def write_mapping(build_dir: Path, mapping: dict, keys: list[str]):
+        """
+        Remplace les entrées keys de la table des variantes par celles de mapping : les images des
+        documents non pré-rendus gardent les leurs.
+        """
+        path = build_dir / VARIANTS_MAPPING
+        try:
+            current = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            current = {}
+        merged = {key: value for key, value in current.items() if key not in set(keys)}
+        merged.update((key, value) for key, value in mapping.items() if value)
+        if merged == current:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_if_changed(path, json.dumps(merged, indent=1, sort_keys=True))
@@ -1,18 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from dataclasses import dataclass, field
+import logging
 from pathlib import Path
 import shutil
 from typing import ClassVar
+from docgen.outputs import GENERATED_PATH_IN_BUILD_DIR
 from docgen.outputs.abstract import AbstractOutput
+from docgen.outputs.content_store import ContentStore
 from docgen.outputs.descriptor import OutputPathDescriptor
-from docgen.utils.path import has_been_modified
+from docgen.outputs.image_variants import RASTER_SUFFIXES, ImageVariantCache, SourceImage
+from docgen.settings import settings
+from docgen.utils.hashing import file_state
+from docgen.utils.path import has_been_modified, hash_file_content
 
+logger = logging.getLogger(__name__)
 
+@dataclass
 class ImgCopy(AbstractOutput):
     """
     Copie évenuellement un image hors de la source dans le build et modifie le passe de l'image
     dans la source.
+
+    Les images copiées passent par le magasin adressé par contenu (cf. ContentStore, settings.image_store) :
+    le build_dir est lié à un blob unique par contenu, partagé entre les projets.
+    Les variantes de l'image par format sont produites par transcode() (cf. ImageVariantCache).
     """
-    _copy_cache:ClassVar[set] = set()
+    copy_job: tuple = field(default=None, init=False) # (source, empreinte, destination) de la copie à faire
+    image_path: Path = field(default=None, init=False) # fichier image lu
+    image_key: str = field(default=None, init=False) # chemin de l'image dans le build_dir
+
+    _copy_cache:ClassVar[set] = set() # destinations déjà copiées lors du rendu
+    _digest_cache:ClassVar[dict] = {} # chemin -> ((mtime_ns, taille), empreinte du contenu)
+
+    @classmethod
+    def content_digest(cls, path: Path) -> str:
+        """
+        Empreinte du contenu de l'image, recalculée seulement si le fichier a changé. None si elle est illisible.
+        """
+        state = file_state(path)
+        if state is None:
+            return None
+        cached = cls._digest_cache.get(str(path))
+        if cached is None or cached[0] != state:
+            try:
+                cached = cls._digest_cache[str(path)] = (state, hash_file_content(path))
+            except OSError:
+                return None
+        return cached[1]
+
+    @classmethod
+    def ingest(cls, outputs: list['ImgCopy'], max_workers: int = None):
+        """
+        Effectue les copies des outputs préparés, une fois par destination, dans un pool de threads.
+        """
+        jobs = {}
+        for output in outputs:
+            if output.copy_job is not None and str(output.copy_job[2]) not in cls._copy_cache:
+                jobs.setdefault(str(output.copy_job[2]), output.copy_job)
+        if not jobs:
+            return
+        max_workers = max_workers or settings.transfer_workers
+        if len(jobs) == 1 or max_workers <= 1:
+            for job in jobs.values():
+                cls._copy(*job)
+            return
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # list : propage la première erreur
+            list(pool.map(lambda job: cls._copy(*job), jobs.values()))
+
+    @classmethod
+    def transcode(cls, outputs: list['ImgCopy'], formats: list[str], build_dir: Path):
+        """
+        Produit les variantes par format (réduites, converties) des images des outputs préparés.
+        """
+        if not settings.image_variants or not formats:
+            return
+        if not ImageVariantCache.available():
+            logger.info("Pillow non installé : images rendues sans variantes par format (pip install docgen[images])")
+            return
+        sources = []
+        for output in outputs:
+            if output.image_path is None or output.image_path.suffix.lower() not in RASTER_SUFFIXES:
+                continue
+            digest = cls.content_digest(output.image_path)
+            if digest is not None:
+                sources.append(SourceImage(output.image_key, output.image_path, digest))
+        ImageVariantCache().run(sources, formats, build_dir)
+
+    @classmethod
+    def _copy(cls, src: Path, digest: str, dest: Path):
+        if settings.image_store and digest is not None:
+            ContentStore().materialize(src, digest, dest)
+        elif has_been_modified(src, dest):
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy(src, dest)
+        cls._copy_cache.add(str(dest))
 
     @classmethod
     @contextmanager
@@ -29,7 +112,16 @@ class ImgCopy(AbstractOutput):
 
     def build(self):
         """
-        Copie l'image à partir du chemin spécifié dans le shortcode.
+        Copie l'image à partir du chemin spécifié dans le shortcode, si ingest() ne l'a pas fait.
+        """
+        if not self.sub_by:
+            self.prepare()
+        if self.copy_job is not None and str(self.copy_job[2]) not in self._copy_cache:
+            self._copy(*self.copy_job)
+
+    def prepare(self):
+        """
+        Détermine le chemin de l'image dans le build et le texte de substitution, et la copie à faire.
         """
         # On récupère le chemin de l'image depuis le match : C'est 
         #   une position absolu depuis la source /xxx, 
@@ -67,9 +159,15 @@ class ImgCopy(AbstractOutput):
                                                  dest_dir=self.container.build_dir,)
         
 
+        self.dependencies.append(img_descr.absolute_path)
+
         if img_descr.is_generated:
-            # On garde référence à nom initial de l'image
+            # Nom dérivé du contenu de l'image (du chemin source si elle est illisible),
+            # on garde référence à nom initial de l'image
             new_path = img_descr.relative_new_stem
+            digest = self.content_digest(img_descr.absolute_path)
+            if digest is not None:
+                new_path = Path(".") / GENERATED_PATH_IN_BUILD_DIR / f"{digest[:16]}_"
             new_path = new_path\
                 .with_stem(new_path.stem + f"{img_descr.absolute_path.stem}")\
                 .with_suffix(img_descr.absolute_path.suffix)
@@ -77,13 +175,14 @@ class ImgCopy(AbstractOutput):
             new_path = original_path
 
 
-        if img_descr.is_generated and str(img_descr.absolute_path) not in self._copy_cache:
-            # Copie lors de la première utilisation
+        if img_descr.absolute_path.is_file():
+            self.image_path = img_descr.absolute_path
+            self.image_key = Path(new_path if img_descr.is_generated else img_descr.relative_new_stem).as_posix()
+
+        if img_descr.is_generated and img_descr.absolute_path.exists():
+            # Copie lors de la première utilisation (cf. ingest)
             dest = img_descr.absolute_new_stem.with_name(new_path.name)
-            if has_been_modified(img_descr.absolute_path, dest):
-                dest.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy(img_descr.absolute_path, dest)
-                self._copy_cache.add(str(img_descr.absolute_path))
+            self.copy_job = (img_descr.absolute_path, digest, dest)
 
 
         self.sub_by = self.rematch.group(0).replace(self.rematch.group(1), str(new_path))   
@@ -0,0 +1,122 @@
+from dataclasses import dataclass, field
+import logging
+
+from docgen.outputs.readers import complete_rows
+from docgen.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Au-delà, le bloc englobant est jugé trop creux : chaque plage est lue séparément
+MAX_BLOCK_CELLS = 5_000_000
+
+
+@dataclass
+class SheetBlock:
+    """
+    Valeurs d'une feuille lues en une seule passe : rectangle englobant des plages demandées.
+    Les valeurs couvrent tout le rectangle, y compris au-delà de la fin de la feuille (cf. fill).
+    """
+    min_col: int
+    min_row: int
+    max_col: int
+    max_row: int
+    values: list[list] = field(default_factory=list)
+
+    @property
+    def n_rows(self) -> int:
+        return self.max_row - self.min_row + 1
+
+    @property
+    def n_cols(self) -> int:
+        return self.max_col - self.min_col + 1
+
+    @property
+    def n_cells(self) -> int:
+        return self.n_cols * self.n_rows
+
+    def fill(self, rows):
+        """
+        Affecte les lignes lues, complétées aux dimensions du bloc : un bloc lu et le même bloc
+        relu depuis le cache (cf. SheetBlockCache) ont la même forme.
+        """
+        self.values = complete_rows(rows, self.n_rows, self.n_cols)
+
+    def slice(self, boundaries: tuple) -> list[list]:
+        """
+        Valeurs de la plage (min_col, min_row, max_col, max_row), contenue dans le bloc.
+        """
+        min_col, min_row, max_col, max_row = boundaries
+        c0, c1 = min_col - self.min_col, max_col - self.min_col + 1
+        return [row[c0:c1] for row in self.values[min_row - self.min_row:max_row - self.min_row + 1]]
+
+
+class ExtractionPlan:
+    """
+    Regroupe les extractions Excel par classeur et par feuille : les lignes de chaque feuille
+    ne sont parcourues qu'une fois, pour le rectangle englobant toutes les plages demandées,
+    puis chaque plage est découpée dans ce bloc en mémoire.
+
+    Avec un cache (cf. SheetBlockCache), les blocs déjà lus lors d'un rendu précédent, quel que soit
+    le projet, ne sont pas relus et les blocs lus sont enregistrés.
+    """
+
+    def __init__(self, cache: 'SheetBlockCache' = None):
+        self.groups: dict[tuple[str, str], list] = {}
+        self.cache = cache
+
+    def add(self, core_out):
+        """
+        Ajoute l'extraction d'un CoreExcelOutput au plan.
+        """
+        if core_out._range_boudaries is None or None in core_out._range_boudaries:
+            # Plage non bornée (colonne ou ligne entière) : lue seule
+            return
+        self.groups.setdefault((core_out.wb_path_str, core_out._sheet_name), []).append(core_out)
+
+    def execute(self):
+        """
+        Lit chaque feuille une fois et affecte son bloc à chaque CoreExcelOutput du plan.
+        Les feuilles sont lues classeur par classeur : un classeur n'est pas rouvert après éviction
+        du cache des classeurs.
+        """
+        groups = sorted(self.groups.items(), key=lambda item: item[0][0])
+        for (wb_path, sheet_name), core_outs in groups:
+            boundaries = [c._range_boudaries for c in core_outs]
+            block = SheetBlock(
+                min_col=min(b[0] for b in boundaries),
+                min_row=min(b[1] for b in boundaries),
+                max_col=max(b[2] for b in boundaries),
+                max_row=max(b[3] for b in boundaries),
+            )
+            key = None
+            if self.cache is not None:
+                signature = core_outs[0].zip_signature()
+                if signature is not None:
+                    key = self.cache.key(signature, sheet_name, settings.excel_reader)
+                    cached = self.cache.get(key, (block.min_col, block.min_row, block.max_col, block.max_row))
+                    if cached is not None:
+                        logger.debug(f"{len(core_outs)} plages lues depuis le cache dans {wb_path} [{sheet_name}]")
+                        for core_out in core_outs:
+                            core_out._block = cached
+                        continue
+                    cached_boundaries = self.cache.boundaries(key)
+                    if cached_boundaries is not None:
+                        # Le bloc enregistré couvre aussi les plages lues précédemment (autres projets, ...)
+                        union = SheetBlock(
+                            min_col=min(block.min_col, cached_boundaries[0]),
+                            min_row=min(block.min_row, cached_boundaries[1]),
+                            max_col=max(block.max_col, cached_boundaries[2]),
+                            max_row=max(block.max_row, cached_boundaries[3]),
+                        )
+                        if union.n_cells <= MAX_BLOCK_CELLS:
+                            block = union
+            if (len(core_outs) < 2 and key is None) or block.n_cells > MAX_BLOCK_CELLS:
+                continue
+            block.fill(core_outs[0].reader.iter_rows(
+                sheet_name, min_row=block.min_row, max_row=block.max_row,
+                min_col=block.min_col, max_col=block.max_col))
+            logger.debug(f"{len(core_outs)} plages lues en une passe dans {wb_path} [{sheet_name}]")
+            if key is not None:
+                self.cache.put(key, block)
+            for core_out in core_outs:
+                core_out._block = block
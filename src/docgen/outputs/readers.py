@@ -0,0 +1,267 @@
+from pathlib import Path
+from typing import ClassVar, Iterator
+from xml.etree import ElementTree
+import zipfile
+
+import openpyxl
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.cell import coordinate_to_tuple, range_boundaries
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+from docgen.utils.xlsx import SHARED_STRINGS_XML, STYLES_XML, WORKBOOK_XML, sheet_members
+
+
+def complete_rows(rows, n_rows: int, width: int) -> list[list]:
+    """
+    Lignes complétées à n_rows lignes de width valeurs (None pour les cellules absentes) :
+    en lecture seule, openpyxl s'arrête à la dernière ligne de la feuille.
+    """
+    result = [row if type(row) is list and len(row) == width else (list(row) + [None] * width)[:width]
+              for row in rows]
+    result.extend([None] * width for _ in range(n_rows - len(result)))
+    return result
+
+
+class ExcelReader:
+    """
+    Lecture des valeurs (calculées) d'une plage de cellules d'un classeur.
+
+    Les lignes sont retournées complètes : une liste de max_col - min_col + 1 valeurs
+    pour chaque ligne de min_row à max_row, None pour les cellules vides.
+    """
+    name: ClassVar[str] = None
+
+    def __init__(self, wb_path: Path, workbook=None):
+        self.wb_path = Path(wb_path)
+
+    def iter_rows(self, sheet_name: str, min_row: int, max_row: int, min_col: int, max_col: int) -> Iterator[list]:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class OpenpyxlReader(ExcelReader):
+    """
+    Lecture par openpyxl (Worksheet.iter_rows). Les lignes au-delà de la fin de la feuille,
+    absentes en lecture seule, sont complétées.
+
+    Parameters:
+        workbook (openpyxl.Workbook, optional): classeur déjà chargé (par défaut chargé en lecture seule)
+    """
+    name = "openpyxl"
+
+    def __init__(self, wb_path: Path, workbook=None):
+        super().__init__(wb_path)
+        self._owned = workbook is None
+        self.workbook = workbook or openpyxl.load_workbook(self.wb_path, read_only=True, data_only=True)
+
+    def iter_rows(self, sheet_name, min_row, max_row, min_col, max_col):
+        rows = self.workbook[sheet_name].iter_rows(min_row=min_row, max_row=max_row,
+                                                   min_col=min_col, max_col=max_col, values_only=True)
+        if None in (min_row, max_row, min_col, max_col):
+            # Plage non bornée : limites de la feuille
+            yield from map(list, rows)
+            return
+        yield from complete_rows(rows, max_row - min_row + 1, max_col - min_col + 1)
+
+    def close(self):
+        if self._owned:
+            self.workbook.close()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _text(element) -> str:
+    """
+    Texte d'une chaîne (<si> ou <is>) : <t> directs et <t> des runs <r>, hors phonétique (<rPh>).
+    """
+    parts = []
+    for child in element:
+        tag = _local(child.tag)
+        if tag == "t":
+            parts.append(child.text or "")
+        elif tag == "r":
+            parts.extend(t.text or "" for t in child if _local(t.tag) == "t")
+    return "".join(parts)
+
+
+class _SharedStrings:
+    """
+    Table des chaînes partagées lue à la demande : sharedStrings.xml n'est parcouru que jusqu'au
+    plus grand indice demandé.
+    """
+
+    def __init__(self, zf: zipfile.ZipFile):
+        self._zf = zf
+        self._strings = []
+        self._parser = None
+
+    def _iter_strings(self):
+        if SHARED_STRINGS_XML not in self._zf.NameToInfo:
+            return
+        with self._zf.open(SHARED_STRINGS_XML) as f:
+            for _, element in ElementTree.iterparse(f):
+                if _local(element.tag) == "si":
+                    yield _text(element)
+                    element.clear()
+
+    def __getitem__(self, index: int) -> str:
+        if self._parser is None:
+            self._parser = self._iter_strings()
+        while len(self._strings) <= index:
+            try:
+                self._strings.append(next(self._parser))
+            except StopIteration:
+                raise IndexError(f"Chaîne partagée {index} absente de {SHARED_STRINGS_XML}")
+        return self._strings[index]
+
+
+class StreamingXlsxReader(ExcelReader):
+    """
+    Lecture en flux du XML de la feuille (xl/worksheets/sheetN.xml) par un parseur incrémental :
+    le parcours s'arrête après la dernière ligne demandée et les chaînes partagées ne sont lues
+    qu'à la demande. Extraire une plage en haut d'une feuille de 500 000 lignes ne parcourt
+    que le début de la feuille.
+
+    Les valeurs sont celles d'openpyxl en lecture seule (data_only) : dernière valeur calculée
+    des formules, dates selon le format de nombre des cellules.
+    """
+    name = "stream"
+
+    def __init__(self, wb_path: Path, workbook=None):
+        super().__init__(wb_path)
+        self._zf = zipfile.ZipFile(self.wb_path)
+        self._sheets = sheet_members(self._zf)
+        self._shared_strings = _SharedStrings(self._zf)
+        self._epoch = CALENDAR_WINDOWS_1900
+        with self._zf.open(WORKBOOK_XML) as f:
+            for _, element in ElementTree.iterparse(f):
+                if _local(element.tag) == "workbookPr":
+                    if element.get("date1904") in ("1", "true"):
+                        self._epoch = CALENDAR_MAC_1904
+                    break
+        self._date_styles, self._timedelta_styles = self._read_number_formats()
+
+    def _read_number_formats(self) -> tuple[set[int], set[int]]:
+        """
+        Styles de cellule (cellXfs) dont le format de nombre est une date, une durée.
+        """
+        date_styles, timedelta_styles = set(), set()
+        if STYLES_XML not in self._zf.NameToInfo:
+            return date_styles, timedelta_styles
+        root = ElementTree.fromstring(self._zf.read(STYLES_XML))
+        custom = {}
+        cell_xfs = []
+        for element in root:
+            tag = _local(element.tag)
+            if tag == "numFmts":
+                custom = {int(f.get("numFmtId")): f.get("formatCode") for f in element}
+            elif tag == "cellXfs":
+                cell_xfs = [int(xf.get("numFmtId", 0)) for xf in element]
+        for idx, num_fmt_id in enumerate(cell_xfs):
+            fmt = custom.get(num_fmt_id) or BUILTIN_FORMATS.get(num_fmt_id)
+            if fmt is None:
+                continue
+            if is_date_format(fmt):
+                date_styles.add(idx)
+            if is_timedelta_format(fmt):
+                timedelta_styles.add(idx)
+        return date_styles, timedelta_styles
+
+    def _value(self, cell):
+        data_type = cell.get("t", "n")
+        if data_type == "inlineStr":
+            for child in cell:
+                if _local(child.tag) == "is":
+                    return _text(child)
+            return None
+        value = None
+        for child in cell:
+            if _local(child.tag) == "v":
+                value = child.text or None
+                break
+        if value is None:
+            return None
+        if data_type == "n":
+            value = float(value) if "." in value or "E" in value or "e" in value else int(value)
+            style_id = int(cell.get("s", 0))
+            if style_id in self._date_styles:
+                try:
+                    return from_excel(value, self._epoch, timedelta=style_id in self._timedelta_styles)
+                except (OverflowError, ValueError):
+                    return "#VALUE!"
+            return value
+        if data_type == "s":
+            return self._shared_strings[int(value)]
+        if data_type == "b":
+            return bool(int(value))
+        if data_type == "d":
+            return from_ISO8601(value)
+        return value # str, e
+
+    def iter_rows(self, sheet_name, min_row, max_row, min_col, max_col):
+        member = self._sheets.get(sheet_name)
+        if member is None:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+        bounds = [min_col, min_row, max_col, max_row]
+        row_idx = 0
+        sheet_data = None
+        with self._zf.open(member) as f:
+            for event, element in ElementTree.iterparse(f, events=("start", "end")):
+                tag = _local(element.tag)
+                if event == "start":
+                    if tag == "sheetData":
+                        sheet_data = element
+                        if None in bounds:
+                            raise ValueError(f"Plage non bornée et dimension absente de la feuille {sheet_name}")
+                        min_col, min_row, max_col, max_row = bounds
+                        width = max_col - min_col + 1
+                        next_row = min_row
+                    continue
+                if tag == "dimension" and None in bounds:
+                    # Plage non bornée (colonnes ou lignes entières) : limites de la feuille
+                    bounds = [b if b is not None else d
+                              for b, d in zip(bounds, range_boundaries(element.get("ref", "A1")))]
+                    continue
+                if tag != "row":
+                    continue
+                # Les lignes lues sont retirées de l'arbre : mémoire constante
+                sheet_data.remove(element)
+                r = element.get("r")
+                row_idx = int(r) if r else row_idx + 1
+                if row_idx < min_row:
+                    continue
+                if row_idx > max_row:
+                    break
+                values = [None] * width
+                col_idx = 0
+                for cell in element:
+                    if _local(cell.tag) != "c":
+                        continue
+                    coordinate = cell.get("r")
+                    col_idx = coordinate_to_tuple(coordinate)[1] if coordinate else col_idx + 1
+                    if min_col <= col_idx <= max_col:
+                        values[col_idx - min_col] = self._value(cell)
+                # Lignes absentes du XML (vides)
+                for _ in range(next_row, row_idx):
+                    yield [None] * width
+                yield values
+                next_row = row_idx + 1
+        for _ in range(next_row, max_row + 1):
+            yield [None] * width
+
+    def close(self):
+        self._zf.close()
+
+
+READERS: dict[str, type[ExcelReader]] = {reader.name: reader for reader in (OpenpyxlReader, StreamingXlsxReader)}
+
+
+def get_reader_class(name: str) -> type[ExcelReader]:
+    try:
+        return READERS[name]
+    except KeyError:
+        raise ValueError(f"Lecteur Excel {name} inconnu. Lecteurs disponibles : {', '.join(READERS)}")
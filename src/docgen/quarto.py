@@ -19,6 +19,30 @@ def run(cmd:list|tuple, **kwargs):
     return subprocess.run([str(settings.local_quarto_exe),*cmd], **kwargs)
 
 
+def popen(cmd:list|tuple, **kwargs) -> subprocess.Popen:
+    """
+    Lance quarto local en arrière-plan (quarto preview, ...) en utilisant subprocess.Popen.
+    """
+    assert isinstance(cmd, (list, tuple)), "cmd doit être une liste ou un tuple"
+    logger.debug(f"Lancement de la commande Quarto : {cmd}, kwargs={kwargs}")
+    return subprocess.Popen([str(settings.local_quarto_exe),*cmd], **kwargs)
+
+
+def quarto_version() -> str:
+    """
+    Retourne la version de quarto local sans lancer de sous-processus si possible
+    (fichier share/version de la distribution Quarto).
+    """
+    p = settings.local_quarto_path / "share" / "version"
+    if p.exists():
+        return p.read_text(encoding="utf-8").strip()
+    try:
+        cp = run(["--version"], capture_output=True, text=True)
+        return cp.stdout.strip()
+    except FileNotFoundError:
+        return ""
+
+
 def register_kernel():
     """
     Enregistre le kernel Jupyter sous le nom 'docgen_env' pour Quarto.
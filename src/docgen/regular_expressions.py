@@ -11,3 +11,13 @@ class DynotecRegularExpressions:
     excel_img_syntax = re.compile(r"excel(?:-img)?\[(.*)\]\((.*)\?(.*)\)")
     excel_table_syntax = re.compile(r"excel-table\[(.*)\]\((.*)\?(.*)\)")
 
+    # Début ou fin de shortcode, en une seule passe (échappement jinja)
+    shortcode = re.compile(f"(?P<start>{shortcode_start.pattern})|(?P<end>{shortcode_end.pattern})")
+
+    # Toutes les références d'un document markdown, en une seule passe (cf. docgen.document)
+    # L'ordre de l'alternative départage deux références débutant à la même position
+    references = re.compile(
+        f"(?P<excel_img>{excel_img_syntax.pattern})"
+        f"|(?P<excel_table>{excel_table_syntax.pattern})"
+        f"|(?P<image>{path_in_img.pattern})"
+        f"|(?P<shortcode>{shortcode_start.pattern})")
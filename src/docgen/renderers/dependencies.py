@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+from pathlib import Path
+
+from docgen.utils.hashing import file_state
+
+logger = logging.getLogger(__name__)
+
+DEPENDENCY_GRAPH_FILE = "deps.json"
+
+
+class DependencyGraph:
+    """
+    Graphe de dépendances persistant du build_dir, construit lors du pré-rendu :
+    documents -> documents inclus ({{< include >}}) -> assets (images, classeurs).
+
+    Les documents sont identifiés par leur chemin relatif (posix) au build_dir, les assets par
+    leur chemin absolu et leur (mtime_ns, taille) lors du pré-rendu.
+
+    Il permet de ne pré-rendre que les documents modifiés (ou dont un asset est modifié) et de
+    ne rendre que les documents racines (non inclus) concernés.
+
+    Le graphe n'est valable que pour une empreinte key (variables, _quarto.yml, formats, ...) :
+    si elle diffère, tous les documents sont pré-rendus et rendus.
+    """
+    VERSION = 2
+
+    def __init__(self, path: Path, key: str = None):
+        self.path = Path(path)
+        self.key = key
+        self.documents: dict[str, dict] = {} # {"includes": [...], "assets": {chemin: [mtime_ns, taille]}}
+        self.pending: set[str] = set() # documents copiés par le mirror, pas encore pré-rendus
+        self.rendered: dict[str, list[str]] = {} # documents racines rendus, par emplacement de rendu
+        self.valid = False
+
+    @classmethod
+    def load(cls, path: Path, key: str) -> 'DependencyGraph':
+        result = cls(path, key)
+        if not result.path.exists():
+            return result
+        try:
+            data = json.loads(result.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Graphe de dépendances illisible {result.path}: {e}")
+            return result
+        if data.get("version") != cls.VERSION or data.get("key") != key:
+            return result
+        result.documents = data.get("documents", {})
+        result.pending = set(data.get("pending", []))
+        result.rendered = data.get("rendered", {})
+        result.valid = True
+        return result
+
+    def save(self):
+        data = {
+            "version": self.VERSION,
+            "key": self.key,
+            "documents": self.documents,
+            "pending": sorted(self.pending),
+            "rendered": self.rendered,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def invalidate(self):
+        """
+        Supprime le graphe enregistré : le prochain rendu sera complet.
+        """
+        self.valid = False
+        self.path.unlink(missing_ok=True)
+
+    def update(self, document: str, includes: list[str], assets: list[Path]):
+        self.documents[document] = {
+            "includes": sorted(set(includes)),
+            "assets": {str(p): file_state(p) for p in sorted(set(map(str, assets)))},
+        }
+
+    def included(self) -> set[str]:
+        return {i for node in self.documents.values() for i in node["includes"]}
+
+    def roots(self) -> list[str]:
+        """
+        Documents non inclus par un autre document.
+        """
+        included = self.included()
+        return sorted(d for d in self.documents if d not in included)
+
+    def assets(self, document: str) -> set[Path]:
+        return {Path(p) for p in self.documents.get(document, {}).get("assets", {})}
+
+    def changed_documents(self) -> set[str]:
+        """
+        Documents dont un asset a été modifié depuis leur pré-rendu.
+        """
+        cache = {}
+        result = set()
+        for document, node in self.documents.items():
+            for p, state in node["assets"].items():
+                if p not in cache:
+                    cache[p] = file_state(p)
+                if cache[p] != state:
+                    result.add(document)
+                    break
+        return result
+
+    def affected_roots(self, documents: set[str]) -> set[str]:
+        """
+        Documents racines concernés par la modification de documents (eux-mêmes ou via inclusions).
+        """
+        parents = {}
+        for document, node in self.documents.items():
+            for i in node["includes"]:
+                parents.setdefault(i, set()).add(document)
+        affected, stack = set(), list(documents)
+        while stack:
+            document = stack.pop()
+            if document in affected:
+                continue
+            affected.add(document)
+            stack.extend(parents.get(document, ()))
+        included = self.included()
+        return {d for d in affected if d in self.documents and d not in included}
+
+    def mark_outdated(self, roots: set[str]):
+        """
+        Les documents racines roots devront être rendus à nouveau, quel que soit l'emplacement de rendu.
+        """
+        for slot, rendered in self.rendered.items():
+            self.rendered[slot] = [r for r in rendered if r not in roots]
@@ -1,6 +1,6 @@
 import os
 from typing import Iterator
-from docgen.regular_expressions import DynotecRegularExpressions
+from docgen.document import escape_shortcodes
 from docgen.utils.source import markdown_file_iterator
 import yaml
 import glob
@@ -22,9 +22,7 @@ class BasePreRendererJinja:
     
     def prepare_content(self,text: str) -> str:
         # Échapper les syntaxe quarto pour éviter les erreurs de rendu
-        s = DynotecRegularExpressions.shortcode_start.sub("{{'{{< '}}",text)
-        s = DynotecRegularExpressions.shortcode_end.sub("{{' >}}'}}", s)
-        return s
+        return escape_shortcodes(text)
     
     def render_content(self, content: str, context: dict) -> str:
         content = self.prepare_content(content)
@@ -1,17 +1,22 @@
-from dataclasses import field
-import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import chain
+import json
 import logging
 from pathlib import Path
-import shutil
 from typing import List
-from docgen.extensions import add_extension
+from docgen.extensions import PERSISTENT_PATHS as EXTENSION_PERSISTENT_PATHS, extension_fingerprint, install_extension
+from docgen.document import Document
 from docgen.outputs import GENERATED_PATH_IN_BUILD_DIR
 from docgen.outputs.container import OutputsContainer
-from docgen.regular_expressions import DynotecRegularExpressions
+from docgen.renderers.dependencies import DEPENDENCY_GRAPH_FILE, DependencyGraph
 from docgen.renderers.pre.jinja import BasePreRendererJinja
-from docgen.utils.path import hash_path, resolve_path
-from docgen.utils.mirror import mirror
+from docgen.utils.path import hash_path, resolve_path, write_if_changed, write_stats
+from docgen.utils.mirror import mirror, mirror_paths
+from docgen.utils.hashing import file_state, fingerprint
+from docgen.utils.state import PersistentState
 from docgen.settings import settings
+from docgen.quarto import quarto_version
 from docgen.utils.source import markdown_file_iterator
 from docgen.utils.yml import read_yml, to_yml
 import yaml
@@ -19,9 +24,25 @@ import yaml
 logger = logging.getLogger(__name__)
 
 PREVENT_OUTPUT_DIR_MIRROR_FILE = ".prevent_output_dir_mirror"
+MIRROR_SRC_MANIFEST = "mirror_src.json"
+OVERLAY_MANIFEST = "overlay.json"
+RENDER_CACHE_FILE = "render_cache.json"
 
+# Fichiers écrits dans le build_dir lors du rendu, absents du manifest du mirror :
+# ils sont supprimés avant chaque rendu s'ils n'existent pas dans le dossier source
+WRITTEN_IN_BUILD_DIR = ["index.qmd"]
+
+# Fichiers de configuration lus dans le dossier source et réécrits dans le build_dir à chaque rendu
+# (cf. set_variables_yml, TypeRenderer.render) : non synchronisés, ils ne sont écrits que s'ils changent
+WRITTEN_FROM_SOURCE = ["_quarto.yml", "_variables.yml"]
+
+MARKDOWN_SUFFIXES = (".md", ".qmd")
+
+@dataclass
 class ParsedItemContainers:
     not_included_files:list[Path] = field(default_factory=list)
+    dependencies:set[Path] = field(default_factory=set) # fichiers lus par les outputs (classeurs, images)
+    document_dependencies:dict[Path, set[Path]] = field(default_factory=dict) # idem, par fichier markdown du build_dir
     
 
 class Renderer:
@@ -37,8 +58,15 @@ class Renderer:
         
         jinja: bool = False,
 
-        quarto_render_args: list[str] = None
-        
+        quarto_render_args: list[str] = None,
+
+        render_cache: bool = None,
+
+        jobs: int = 1,
+
+        split_formats: bool = False,
+
+        excel_workers: int = None
         
     ):
         f"""
@@ -52,6 +80,14 @@ class Renderer:
             build_dir (Path, optional): Dossier dans lequel dynotec travaille (mirroir de source dir) (par défaut le dossier est un dossier caché)
             jinja (bool): si True, active le pré-rendu Jinja pour les fichiers .qmd et .md
             quarto_render_args (list[str], optional): arguments supplémentaires à passer au rendu.
+            render_cache (bool, optional): si True, un rendu dont toutes les entrées sont identiques au dernier rendu réussi
+                n'appelle pas Quarto, les sorties précédentes sont restaurées (par défaut settings.render_cache)
+            jobs (int): nombre de rendus Quarto simultanés. Si > 1, chaque type de projet est rendu dans
+                son propre dossier isolé, copie du build_dir pré-rendu.
+            split_formats (bool): si True, chaque format d'un type de projet fait l'objet d'un rendu Quarto distinct
+                (section format: restreinte), dans son propre dossier isolé. Les sorties sont fusionnées.
+            excel_workers (int, optional): nombre de processus pour l'extraction des classeurs Excel lors du pré-rendu,
+                un classeur par processus (par défaut settings.excel_workers)
 
         """
         
@@ -90,6 +126,18 @@ class Renderer:
 
         self.parsed_items = ParsedItemContainers()
 
+        self.render_cache = settings.render_cache if render_cache is None else render_cache
+        self.mirror_result = None
+        self.jobs = max(1, jobs or 1)
+        self.split_formats = split_formats
+        self.excel_workers = max(1, excel_workers or settings.excel_workers)
+        self._persistent_state_key = None
+
+        self.persistent_state = PersistentState(self.build_dir, self.persistent_paths(),
+                                                manifests=[MIRROR_SRC_MANIFEST])
+        self.dependency_graph = DependencyGraph(self.persistent_state.state_dir / DEPENDENCY_GRAPH_FILE)
+        self.affected_documents = None # documents pré-rendus, None si tous l'ont été
+
     def validate_projet_types(self,project_types)->List[str]:
         result = settings._enforce_list(project_types) or settings.get_default_project_types()
         if 'user' in result and len(result)>1:
@@ -122,12 +170,67 @@ class Renderer:
 
 
 
+    def persistent_paths(self) -> list[str]:
+        """
+        Chemins du build_dir conservés d'un rendu à l'autre, déclarés par 
+        les types de projet et par l'installation de l'extension.
+        """
+        from docgen.renderers.type.abstract import TypeRenderer
+        result = []
+        if 'user' not in self.project_types:
+            result.extend(EXTENSION_PERSISTENT_PATHS)
+        for pt in self.project_types:
+            result.extend(TypeRenderer.type_class(pt).get_persistent_paths())
+        return result
+
+    def persistent_state_key(self) -> str:
+        """
+        Empreinte invalidant l'état persistant : version de Quarto, extension docgen et _quarto.yml.
+        """
+        quarto_yml = self._quarto_yml.read_bytes() if self._quarto_yml.exists() else b""
+        return fingerprint(quarto_version(), extension_fingerprint(), quarto_yml)
+
+    def validate_persistent_state(self) -> bool:
+        """
+        Supprime l'état persistant du build_dir si celui-ci n'est plus valide.
+        """
+        self._persistent_state_key = self.persistent_state_key()
+        return self.persistent_state.validate(self._persistent_state_key)
+
+    def overlay_dir(self, name: str) -> Path:
+        """
+        Dossier de travail isolé, voisin du build_dir.
+        """
+        return self.build_dir.with_name(f"{self.build_dir.name}.{name}")
+
+    def make_overlay(self, work_dir: Path, persistent_paths: list[str]) -> Path:
+        """
+        Synchronise le build_dir pré-rendu vers un dossier de travail isolé, dans lequel un rendu
+        Quarto peut être lancé en parallèle d'autres. Les assets y sont des hardlinks (cf. Transfer),
+        les fichiers modifiés lors du rendu (_quarto.yml, markdown) des copies.
+
+        L'état persistant du build_dir n'est pas copié, celui du dossier de travail est conservé
+        et invalidé avec celui du build_dir.
+        """
+        from docgen.renderers.type.abstract import TypeRenderer
+        state = PersistentState(work_dir, persistent_paths, manifests=[OVERLAY_MANIFEST])
+        state.validate(self._persistent_state_key or self.persistent_state_key())
+
+        excluded = [self.persistent_state.state_dir, self._in_mirror_quarto_yml]
+        for pt in self.project_types:
+            excluded.extend(self.build_dir / p for p in TypeRenderer.type_class(pt).get_persistent_paths())
+        mirror(self.build_dir, work_dir,
+               excluded=excluded,
+               kept_orphans=[*state.paths(), work_dir / "_quarto.yml"],
+               manifest=state.state_dir / OVERLAY_MANIFEST)
+        return work_dir
+
     def prevent_output_mirror(self):
         """
         Ajouter un fichier pour empêcher le mirroir de output_dir vers build_dir.
         """
         if self.output_dir.exists():
-            (self.output_dir / PREVENT_OUTPUT_DIR_MIRROR_FILE).write_text("DO NOT REMOVE THIS FILE. IT PREVENTS OUTPUT MIRRORING.")
+            write_if_changed(self.output_dir / PREVENT_OUTPUT_DIR_MIRROR_FILE, "DO NOT REMOVE THIS FILE. IT PREVENTS OUTPUT MIRRORING.")
 
     def mirror_src(self):
         """
@@ -138,24 +241,31 @@ class Renderer:
 
         self.prevent_output_mirror()
 
-        excluded = [self.build_dir]
+        excluded = [self.build_dir, *(self.source_dir / name for name in WRITTEN_FROM_SOURCE)]
 
         for d in self.source_dir.iterdir():
             if d.is_dir() and (d/PREVENT_OUTPUT_DIR_MIRROR_FILE).exists():
                 excluded.append(d)
 
-        mirror(self.source_dir, self.build_dir,
+        self.mirror_result = mirror(self.source_dir, self.build_dir,
                excluded=excluded,
                kept_orphans=[
-                   self.build_dir/GENERATED_PATH_IN_BUILD_DIR,])
+                   self.build_dir/GENERATED_PATH_IN_BUILD_DIR,
+                   *(self.build_dir / name for name in WRITTEN_FROM_SOURCE),
+                   *self.persistent_state.paths()],
+               manifest=self.persistent_state.state_dir / MIRROR_SRC_MANIFEST,
+               digest=self.render_cache)
+
+        for name in WRITTEN_IN_BUILD_DIR:
+            if not (self.source_dir / name).exists():
+                (self.build_dir / name).unlink(missing_ok=True)
 
-        # On force la copie des fichiers que l'on modifie en place
-        # - dans set_variables_yml
-        # - dans sous_renderer.render
-        for p in [self.source_dir / "_quarto.yml", self.source_dir / "_variables.yml"]:
-            if p.exists():
-                dest = self.build_dir / p.name
-                shutil.copy2(p,dest)
+    def mirror_changes(self, relative_paths: list[Path]):
+        """
+        Synchronise vers build_dir les seuls chemins (relatifs au source_dir) modifiés.
+        """
+        return mirror_paths(self.source_dir, self.build_dir, relative_paths,
+                            manifest=self.persistent_state.state_dir / MIRROR_SRC_MANIFEST)
 
     def quarto_log_xxx_cmd(self):
         """
@@ -188,22 +298,18 @@ class Renderer:
     
     
     def add_extension(self):       
-        # Ajout via quarto add
-        cmd = ["--no-prompt"]
-        cmd.extend(self.quarto_log_xxx_cmd())
-        cmd.append("--quiet")
-        add_extension(self.build_dir, *cmd)
+        # Copie directe de l'extension (équivalent à quarto add), seulement si elle a changé
+        install_extension(self.build_dir)
 
     def set_variables_yml(self,context:dict) -> dict:
         """
-        Met à jour le _variables.yml dans le build_dir avec le contexte donné.
-        Si le fichier n'existe pas, il est créé.
+        Ecrit le _variables.yml du build_dir : celui du dossier source complété par le contexte donné.
+        Le fichier n'est réécrit que si son contenu change.
         On garde une référence au contenu pour l'utiliser ultérieurement.
         """
-        p = self.build_dir / ('_variables.yml')
-        dd = read_yml(p)
+        dd = read_yml(self.source_dir / "_variables.yml")
         dd.update(context)
-        to_yml(p, dd)
+        to_yml(self.build_dir / "_variables.yml", dd)
         self.variables_yaml_content = dd
 
     def prepare_quarto_yml(self):
@@ -212,7 +318,8 @@ class Renderer:
         Le fichier _quarto.yml n'est pas directement écrit à cette étapes.
         Ce sont les sous renderers qui s'en chargeront
         """
-        params  = read_yml(self._in_mirror_quarto_yml)
+        # Lu dans la source : le _quarto.yml du build_dir est réécrit par les sous renderers
+        params  = read_yml(self._quarto_yml)
         
         # On supprime un éventuel output-dir que l'on gère via le mirror et mirror_output
         if "project" in params and "output-dir" in params["project"]:
@@ -239,75 +346,300 @@ class Renderer:
             return resolve_path(path, relative_to=self.build_dir)
         raise ValueError("Un chemin doit être resolved de puis source ou build")
 
-    def pre_render(self):
+    def build_markdown_files(self):
         """
-        Pre_render hors des scripts projets de Quarto.
+        Itère sur les fichiers markdown du build_dir, hors chemins de l'état persistant.
+        """
+        excluded = self.persistent_state.paths()
+        for file in markdown_file_iterator(self.build_dir):
+            if any(p in file.parents for p in excluded):
+                continue
+            yield file
 
+    def dependency_graph_key(self) -> str:
+        """
+        Empreinte au-delà de laquelle le graphe de dépendances n'est plus valable :
+        état persistant (Quarto, extension, _quarto.yml), variables, jinja, types de projet, formats et arguments Quarto.
         """
-        included_files = set()
+        return fingerprint(
+            self._persistent_state_key or self.persistent_state_key(),
+            self.variables_yaml_content,
+            self.pre_render_jinja,
+            sorted(self.project_types),
+            sorted(self.formats),
+            self.quarto_render_args)
+
+    def plan_pre_render(self) -> list[Path]|None:
+        """
+        Documents à pré-rendre d'après le graphe de dépendances du rendu précédent : documents
+        copiés par le mirror et documents dont un asset (image, classeur) a été modifié.
 
-        jinja_renderer = BasePreRendererJinja()
-        outputs_containers = OutputsContainer(build_dir=self.build_dir, source_dir=self.source_dir)
+        Un autre fichier copié ou supprimé par le mirror (.bib, .css, .lua, données lues par du code, ...)
+        peut concerner n'importe quel document : tous sont alors pré-rendus et rendus.
 
+        Returns:
+            list[Path]|None: fichiers du build_dir, None si tous les documents doivent être pré-rendus.
+        """
+        graph = DependencyGraph.load(self.dependency_graph.path, self.dependency_graph_key())
+        self.dependency_graph = graph
+        untracked = self.untracked_changes(graph)
+        if not graph.valid or untracked or any(Path(p).suffix in MARKDOWN_SUFFIXES for p in self.mirror_result.removed):
+            if graph.valid and untracked:
+                logger.info(f"Fichiers modifiés hors graphe de dépendances ({', '.join(untracked[:5])}) : rendu complet")
+            graph.invalidate()
+            return None
+
+        # Enregistrés avant le pré-rendu : le mirror ne les copiera plus au prochain rendu
+        graph.pending |= {p for p in self.mirror_result.copied if Path(p).suffix in MARKDOWN_SUFFIXES}
+        graph.pending |= graph.changed_documents()
+        graph.save()
+        excluded = self.persistent_state.paths()
+        return [file for file in (self.build_dir / p for p in sorted(graph.pending))
+                if file.is_file() and not any(p in file.parents for p in excluded)]
+
+    def untracked_changes(self, graph: DependencyGraph) -> list[str]:
+        """
+        Fichiers non markdown copiés ou supprimés par le mirror qui ne sont pas des assets du graphe.
+        """
+        tracked = {str(p) for document in graph.documents for p in graph.assets(document)}
+        return [p for p in (*self.mirror_result.copied, *self.mirror_result.removed)
+                if Path(p).suffix not in MARKDOWN_SUFFIXES
+                and str(self.source_dir / p) not in tracked and str(self.build_dir / p) not in tracked]
+
+    def files_to_render(self, slot: str, roots: list[str]) -> list[str]:
+        """
+        Documents racines à rendre dans l'emplacement slot : ceux concernés par le pré-rendu
+        et ceux qui n'y ont pas encore été rendus.
+        """
+        if self.affected_documents is None:
+            return roots
+        rendered = set(self.dependency_graph.rendered.get(slot, []))
+        if rendered - set(roots):
+            # Un document racine a disparu (devenu inclus) : sa sortie doit être supprimée
+            return roots
+        affected = self.dependency_graph.affected_roots(self.affected_documents)
+        result = [r for r in roots if r in affected or r not in rendered]
+        if not result and self.mirror_result is not None and (self.mirror_result.copied or self.mirror_result.removed):
+            # Des fichiers ont changé sans qu'aucun document soit identifié : rendu complet
+            return roots
+        return result
+
+    def pre_render(self, files: list[Path] = None):
+        """
+        Pre_render hors des scripts projets de Quarto.
+
+        Parameters:
+            files (list[Path], optional): fichiers markdown du build_dir à pré-rendre (par défaut tous).
+                Les dépendances des autres fichiers sont celles du pré-rendu précédent.
+        """
+        jinja_renderer = BasePreRendererJinja()
+        outputs_containers = OutputsContainer(build_dir=self.build_dir, source_dir=self.source_dir,
+                                              excel_workers=self.excel_workers, formats=self.formats)
+
+        graph = self.dependency_graph
+        if files is None:
+            graph.documents = {}
+            graph.rendered = {}
+            to_pre_render = self.build_markdown_files()
+        else:
+            to_pre_render = [Path(f) for f in files]
 
         # Applique le rendu jinja sur les fichiers .qmd et .md
         # ... le contenu est lu dans la source
-        for file in markdown_file_iterator(self.build_dir):
+        processed = []
+        for file in to_pre_render:
             # .... filtres de certaines fichiers non concernés
             if self.build_dir/GENERATED_PATH_IN_BUILD_DIR in file.parents:
                 continue
             _buildp=Path(file)
             _srcp = self.resolve_path(_buildp.relative_to(self.build_dir), source=True)
+            if not _srcp.is_file():
+                continue
             content = _srcp.read_text(encoding="utf-8")
             
             # Rendu jinja si activé
             if self.pre_render_jinja:
                 content = jinja_renderer.render_content(content, self.variables_yaml_content)
 
-            outputs_containers.feed_from_content(content,file)
-            _buildp.write_text(content, encoding="utf-8")
+            # Une seule passe sur le contenu : références des outputs et inclusions
+            document = Document.scan(content, _buildp)
+            outputs_containers.feed_from_document(document)
+            processed.append(document)
 
+        # Construit les outputs et écrit chaque document une seule fois
         outputs_containers.run()
-
-        # On cherche les inclusions Quarto {{< include "fichier.qmd" >}}
-        for file in markdown_file_iterator(self.build_dir):
-            content = Path(file).read_text(encoding="utf-8")
-            for match in DynotecRegularExpressions.quarto_include.finditer(content):
-                included_file = match.group(1).strip()
+        dependencies_by_content = outputs_containers.dependencies_by_content()
+        includes_by_content = outputs_containers.includes_by_content()
+
+        # Les inclusions Quarto {{< include "fichier.qmd" >}} des documents pré-rendus (y compris celles
+        # insérées par les outputs), celles des autres documents sont dans le graphe
+        for document in processed:
+            includes = []
+            for included_file in document.includes() + includes_by_content.get(document.path, []):
                 included_path = self.resolve_path(included_file, build=True)
                 if included_path.is_file():
-                    included_files.add(included_path)
+                    includes.append(included_path.relative_to(self.build_dir).as_posix())
+            graph.update(document.path.relative_to(self.build_dir).as_posix(), includes, dependencies_by_content.get(document.path, []))
 
+        affected = {document.path.relative_to(self.build_dir).as_posix() for document in processed}
+        if files is not None:
+            graph.mark_outdated(graph.affected_roots(affected))
+        graph.pending -= affected
+        graph.save()
+        self.affected_documents = None if files is None else affected
 
+        self.parsed_items.document_dependencies = {self.build_dir / d: graph.assets(d) for d in graph.documents}
+        self.parsed_items.dependencies = set(chain.from_iterable(self.parsed_items.document_dependencies.values()))
+
+        included_files = {self.build_dir / p for p in graph.included()}
         self.parsed_items.not_included_files = list(filter(
-                lambda p: p.is_file() and self.resolve_path(p, build=True) not in included_files,
-                markdown_file_iterator(self.build_dir))
+                lambda p: p.is_file() and p not in included_files,
+                self.build_markdown_files())
                 )
 
         
+    @property
+    def render_cache_file(self) -> Path:
+        return self.persistent_state.state_dir / RENDER_CACHE_FILE
+
+    def render_cache_key(self) -> str:
+        """
+        Empreinte de toutes les entrées du rendu : contenu des fichiers sources, variables (contexte compris),
+        types de projet, formats, arguments Quarto et empreinte de l'état persistant (version de Quarto,
+        extension docgen et _quarto.yml, exclu du mirror).
+        """
+        sources = sorted((k, v.digest) for k, v in self.mirror_result.manifest.entries.items() if not v.is_dir)
+        return fingerprint(
+            sources,
+            self.variables_yaml_content,
+            sorted(self.project_types),
+            sorted(self.formats),
+            self.pre_render_jinja,
+            self.quarto_render_args,
+            self._persistent_state_key or self.persistent_state_key(),
+        )
+
+    @staticmethod
+    def _dependencies_state(paths) -> dict:
+        return {str(p): file_state(p) for p in paths}
+
+    def store_render_cache(self, key: str):
+        """
+        Enregistre l'empreinte du rendu réussi et l'état des fichiers lus par les outputs
+        (éventuellement hors source_dir).
+        """
+        data = {
+            "key": key,
+            "dependencies": self._dependencies_state(self.parsed_items.dependencies),
+        }
+        self.render_cache_file.parent.mkdir(parents=True, exist_ok=True)
+        self.render_cache_file.write_text(json.dumps(data), encoding="utf-8")
+
+    def clear_render_cache(self):
+        self.render_cache_file.unlink(missing_ok=True)
+
+    def restore_from_render_cache(self, key: str) -> bool:
+        """
+        Si le dernier rendu réussi a les mêmes entrées, restaure ses sorties (conservées dans le build_dir)
+        vers output_dir sans appeler Quarto.
+
+        Returns:
+            bool: True si les sorties ont été restaurées.
+        """
+        if not self.render_cache_file.exists():
+            return False
+        try:
+            data = json.loads(self.render_cache_file.read_text(encoding="utf-8"))
+        except ValueError:
+            return False
+        if data.get("key") != key:
+            return False
+        dependencies = data.get("dependencies", {})
+        if self._dependencies_state(dependencies.keys()) != dependencies:
+            return False
+
+        from docgen.renderers.type.abstract import TypeRenderer
+        self.prepare_quarto_yml()
+        type_renderers = [TypeRenderer.from_type(self, pt, self.formats) for pt in self.project_types]
+        if not all(tr._internal_output_dir.exists() for tr in type_renderers):
+            return False
+
+        logger.info("Entrées identiques au dernier rendu : sorties restaurées sans appel à Quarto (--no-render-cache pour forcer le rendu)")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for type_renderer in type_renderers:
+            type_renderer.mirror_output()
+            logger.info(f"\t -> {type_renderer.output_dir}")
+        self.prevent_output_mirror()
+        return True
+
+    def type_renderers(self) -> list:
+        """
+        TypeRenderer de chaque type de projet demandé.
+
+        Les rendus Quarto simultanés (jobs > 1) ou découpés par format (split_formats)
+        sont lancés dans des dossiers isolés, copies du build_dir pré-rendu.
+        """
+        from docgen.renderers.type.abstract import TypeRenderer
+        type_renderers = [TypeRenderer.from_type(self, pt, self.formats) for pt in self.project_types]
+        if self.split_formats:
+            for type_renderer in type_renderers:
+                type_renderer.parts = type_renderer.split_formats()
+        if self.jobs > 1 and sum(len(tr.runs()) for tr in type_renderers) > 1:
+            type_renderers = [
+                tr if tr.parts else TypeRenderer.from_type(self, tr.project_type, self.formats, work_dir=self.overlay_dir(tr.project_type))
+                for tr in type_renderers]
+        return type_renderers
+
     def render(self,jinja_only_context={},**context):
         """
         Lance Quarto sur l'entrée dans le build directory.
         """
         logger.info("" + "="*50)
         logger.info(f"Préparation du rendu Quarto : {self.build_dir}")
+        write_stats.reset()
+        self.validate_persistent_state()
         self.mirror_src()
         self.set_variables_yml(context)
+        to_pre_render = self.plan_pre_render()
+
+        render_cache_key = None
+        if self.render_cache:
+            render_cache_key = self.render_cache_key()
+            if self.restore_from_render_cache(render_cache_key):
+                return
+        self.clear_render_cache()
+
         if 'user' not in self.project_types:
             self.add_extension()
-        self.pre_render()
+        self.pre_render(files=to_pre_render)
+        logger.info(f"Pré-rendu : {write_stats}")
         self.prepare_quarto_yml()
         logger.info("" + "-"*10)
 
         # Création dossier de sortie parent
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        from docgen.renderers.type.abstract import TypeRenderer
-        for pt in self.project_types:
-            logger.info("" + "="*50)
-            logger.info(f"Rendu du type de projet {pt} et format(s) {','.join(self.formats)}")
-            type_renderer = TypeRenderer.from_type(self, pt, self.formats)
-            type_renderer.render()
-            logger.info("" + "-"*10)
-
+        type_renderers = self.type_renderers()
+        runs = [run for type_renderer in type_renderers for run in type_renderer.runs()]
+        logger.info("" + "="*50)
+        logger.info(f"Rendu des types de projet {','.join(self.project_types)} et format(s) {','.join(self.formats)}")
+        if self.jobs > 1 and len(runs) > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                results = list(pool.map(lambda run: run.run_quarto(), runs))
+        else:
+            results = [run.run_quarto() for run in runs]
+        results = dict(zip(map(id, runs), results))
+
+        # Les sorties sont livrées successivement, plusieurs types pouvant partager le même output_dir
+        success = True
+        for type_renderer in type_renderers:
+            type_success = all(results[id(run)] for run in type_renderer.runs())
+            if type_success:
+                type_renderer.deliver()
+            success = success and type_success
+        self.dependency_graph.save()
+        self.prevent_output_mirror()
+        logger.info("" + "-"*10)
 
+        if render_cache_key is not None and success:
+            self.store_render_cache(render_cache_key)
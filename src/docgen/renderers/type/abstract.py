@@ -1,8 +1,11 @@
 import copy
 from dataclasses import dataclass
 import logging
+from pathlib import Path
+from typing import ClassVar
 from docgen.renderers.renderer import Renderer
-from docgen.utils.mirror import mirror
+from docgen.utils.mirror import merge, mirror
+from docgen.utils.transfer import HARDLINK, Transfer
 from docgen.settings import settings
 from docgen.quarto import run as quarto_run
 from docgen.utils.yml import  to_yml
@@ -15,6 +18,11 @@ class TypeRenderer:
     parent: Renderer
     project_type: str
     sub_output_dir: str = None
+    work_dir: Path = None # dossier dans lequel Quarto est lancé, par défaut le build_dir
+    parts: list['TypeRenderer'] = None # rendus par format (cf. split_formats), dont les sorties sont fusionnées
+
+    # Chemins du build_dir, relatifs à celui-ci, conservés d'un rendu à l'autre (état incrémental de Quarto)
+    persistent_paths: ClassVar[list[str]] = [".quarto", "_freeze"]
 
     def __post_init__(self):        
        
@@ -25,7 +33,27 @@ class TypeRenderer:
         # Dans le dossier de build, on impose le output_dir, en respectant la contrainte de quarto : 
         # output_dir doit être relatif au dossier de projet (ici le dossier de build qui un mirroir du projet)
         self._internal_output_dir = self.parent.build_dir / self.sub_output_dir
-        
+
+        # Un work_dir distinct du build_dir est un dossier isolé (cf. Renderer.make_overlay), 
+        # les sorties y sont produites puis synchronisées vers _internal_output_dir
+        if self.work_dir is None:
+            self.work_dir = self.parent.build_dir
+        self._work_output_dir = self.work_dir / self.sub_output_dir
+
+        # Rendu d'une partie des documents seulement (cf. Renderer.files_to_render)
+        self.partial_render = False
+        self._roots = None # documents racines du projet, rendus dans render_slot en cas de succès
+
+    @property
+    def is_isolated(self) -> bool:
+        return self.work_dir != self.parent.build_dir
+
+    @property
+    def render_slot(self) -> str:
+        """
+        Emplacement de rendu : type de projet et dossier de travail (build_dir ou dossier isolé).
+        """
+        return f"{self.project_type}:{self.work_dir.name}"
 
     def has_user_specified_output_dir(self) -> bool:
         return not self.parent.auto_output_dir
@@ -40,9 +68,9 @@ class TypeRenderer:
         return result
 
     @classmethod
-    def from_type(cls, parent:Renderer, project_type:str, formats:list[str] = []):
+    def type_class(cls, project_type:str) -> type['TypeRenderer']:
         """
-        Factory method to create a TypeRenderer based on the project type.
+        Retourne la classe de TypeRenderer associée au type de projet.
         """
         from .book import BookRenderer
         from .website import WebsiteRenderer
@@ -50,18 +78,29 @@ class TypeRenderer:
         from .default import DefaultRenderer
         from .user import UserRenderer
 
-        if project_type == "website":
-            return WebsiteRenderer(parent=parent, formats=formats)
-        elif project_type == "book":
-            return BookRenderer(parent=parent, formats=formats)
-        elif project_type == "manuscript":
-            return ManuscriptRenderer(parent=parent, formats=formats)
-        elif project_type == "default":
-            return DefaultRenderer(parent=parent, formats=formats)
-        elif project_type == "user":
-            # Pour l'utilisateur qui gère ses propres réglages Quarto
-            return UserRenderer(parent=parent)
+        for klass in (WebsiteRenderer, BookRenderer, ManuscriptRenderer, DefaultRenderer, UserRenderer):
+            if klass.project_type == project_type:
+                return klass
         raise ValueError(f"Type de projet {project_type} non supporté. Choisir parmi {settings.get_available_project_types()}")
+
+    @classmethod
+    def from_type(cls, parent:Renderer, project_type:str, formats:list[str] = [], work_dir:Path = None):
+        """
+        Factory method to create a TypeRenderer based on the project type.
+        """
+        klass = cls.type_class(project_type)
+        if project_type == "user":
+            # Pour l'utilisateur qui gère ses propres réglages Quarto
+            return klass(parent=parent, work_dir=work_dir)
+        return klass(parent=parent, formats=formats, work_dir=work_dir)
+
+    @classmethod
+    def get_persistent_paths(cls) -> list[str]:
+        """
+        Chemins du build_dir à conserver entre deux rendus pour ce type de projet :
+        état incrémental de Quarto et dossier de sortie interne.
+        """
+        return [*cls.persistent_paths, cls.sub_output_dir]
     
     
 
@@ -86,18 +125,46 @@ class TypeRenderer:
         # cmd_args.extend(["--no-clean"])
 
         cmd_args.extend([
-            '--output-dir', str(self._internal_output_dir.relative_to(self.parent.build_dir)),
+            '--output-dir', str(self._work_output_dir.relative_to(self.work_dir)),
         ])
 
+        if self.partial_render:
+            # Les sorties des documents non rendus sont conservées
+            cmd_args.append("--no-clean")
+
         cmd_args.extend(self.parent.quarto_log_xxx_cmd())
 
         return cmd_args    
 
+    def split_formats(self) -> list['TypeRenderer']:
+        """
+        Découpe le rendu en un rendu par format, chacun dans son propre dossier isolé.
+        Retourne None si le rendu ne peut pas être découpé.
+        """
+        return None
+
+    def runs(self) -> list['TypeRenderer']:
+        """
+        Rendus Quarto à lancer pour ce type de projet.
+        """
+        return self.parts or [self]
+
+    def collect_outputs(self):
+        """
+        Rassemble dans _internal_output_dir les sorties des rendus isolés.
+        """
+        if self.parts:
+            merge([part._work_output_dir for part in self.parts], self._internal_output_dir)
+        elif self.is_isolated:
+            # Les sorties sont conservées dans le build_dir comme pour un rendu non isolé
+            mirror(self._work_output_dir, self._internal_output_dir)
+
     def mirror_output(self):
         """
         Synchronise le répertoire de sortie dans le build_dir vers le répertoire de sortie 
         de l'appel original.
         """
+        self.collect_outputs()
 
         # On ne supprime les orphelins que si ce explicitement demandé ou non
         # ou si 
@@ -110,28 +177,52 @@ class TypeRenderer:
             rm_orphans = False
         elif self.sub_output_dir is not None:
             rm_orphans = True
+        # Pas de hardlink : les sorties livrées ne doivent pas partager leur contenu avec le build_dir
+        transfer = Transfer(strategies=[s for s in settings.get_transfer_strategies() if s != HARDLINK])
         mirror(
             self._internal_output_dir, 
             self.output_dir,
-            rm_orphans=rm_orphans)
+            rm_orphans=rm_orphans,
+            transfer=transfer)
+
+    def run_quarto(self) -> bool:
+        """
+        Ecrit le _quarto.yml et lance le rendu Quarto dans le work_dir.
+        Les sorties sont disponibles dans _work_output_dir (cf. collect_outputs).
+        """
+        logger.info(f"Rendu Quarto {self.project_type} ({','.join(getattr(self, 'formats', None) or [])}) dans {self.work_dir}")
+        if self.is_isolated:
+            self.parent.make_overlay(self.work_dir, self.get_persistent_paths())
 
-    def render(self):
         params = self.prepare_quarto_yml_content()
-        to_yml(self.parent._in_mirror_quarto_yml, params)
+        if self.partial_render and not params["project"].get("render"):
+            logger.info(f"Aucun document modifié depuis le dernier rendu {self.render_slot}")
+            return True
+        to_yml(self.work_dir / "_quarto.yml", params)
             
         cmd = self.make_quarto_render_cmd_args()
-        build_dir = self.parent.build_dir
 
         cp = quarto_run(
             cmd, 
-            cwd=str(build_dir))
+            cwd=str(self.work_dir))
         if cp.returncode != 0:
             logger.error(f"Erreur lors du rendu: {cp.stderr}")
-        else:
-            self.mirror_output()
-            logger.info(f"Rendu quarto opéré avec succès")
-            logger.info(f"\t -> {self.output_dir}")
-        self.parent.prevent_output_mirror()
-        
-
+            return False
+        if self._roots is not None:
+            self.parent.dependency_graph.rendered[self.render_slot] = self._roots
+        return True
 
+    def deliver(self):
+        """
+        Synchronise les sorties vers le répertoire de sortie.
+        """
+        self.mirror_output()
+        logger.info(f"Rendu quarto opéré avec succès")
+        logger.info(f"\t -> {self.output_dir}")
+
+    def render(self) -> bool:
+        success = all([run.run_quarto() for run in self.runs()])
+        if success:
+            self.deliver()
+        self.parent.prevent_output_mirror()
+        return success
@@ -34,6 +34,18 @@ class BasePreRenderer2(TypeRenderer):
     def get_files_to_render(self) -> list[str]|None:
         pass
 
+    def split_formats(self) -> list[TypeRenderer]:
+        """
+        Un rendu par format, chacun lancé dans un dossier isolé avec une section format: restreinte.
+        """
+        if len(self.formats) < 2:
+            return None
+        return [
+            TypeRenderer.from_type(
+                self.parent, self.project_type, [fmt],
+                work_dir=self.parent.overlay_dir(f"{self.project_type}-{fmt}"))
+            for fmt in self.formats]
+
     def prepare_quarto_yml_content(self)->dict:
         """
             En fonction des fonctionnalités demandée, pour le type de projet demandé et 
@@ -3,6 +3,7 @@ import logging
 from dataclasses import dataclass
 from docgen.renderers.renderer import Renderer
 from docgen.renderers.type.base_pre_renderer2 import BasePreRenderer2
+from docgen.utils.path import write_if_changed
 from docgen.utils.yml import read_yml, to_yml
 
 logger = logging.getLogger(__name__)
@@ -18,14 +19,14 @@ class BookRenderer(BasePreRenderer2):
 
         exists = False
         chapters = []
-        p_index = self.parent.build_dir / f"index.qmd"
+        p_index = self.work_dir / f"index.qmd"
         for suffix in (".md", ".qmd"):
             if p_index.with_suffix(suffix).exists():
                 exists = True
                 p_index = p_index.with_suffix(suffix)
                 break
         if not exists:
-            p_index.write_text("<!--Book Index Obligatoire.-->")
+            write_if_changed(p_index, "<!--Book Index Obligatoire.-->")
 
         if 'book' not in params:
             chapters = []
@@ -19,5 +19,12 @@ class DefaultRenderer(BasePreRenderer2):
         """
         files = []
         for file in self.parent.parsed_items.not_included_files:
-            files.append(str(file.relative_to(self.parent.build_dir)))
-        return files
\ No newline at end of file
+            files.append(file.relative_to(self.parent.build_dir).as_posix())
+
+        # Seuls les documents concernés par les modifications depuis le dernier rendu sont rendus
+        self._roots = files
+        to_render = self.parent.files_to_render(self.render_slot, files)
+        self.partial_render = len(to_render) < len(files)
+        if self.partial_render:
+            logger.info(f"{len(to_render)}/{len(files)} document(s) à rendre, les autres sont inchangés depuis le dernier rendu")
+        return to_render
\ No newline at end of file
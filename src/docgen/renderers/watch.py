@@ -0,0 +1,191 @@
+import logging
+from pathlib import Path
+import subprocess
+from docgen.quarto import popen as quarto_popen
+from docgen.renderers.renderer import PREVENT_OUTPUT_DIR_MIRROR_FILE, WRITTEN_FROM_SOURCE, Renderer
+from docgen.settings import settings
+from docgen.utils.watch import make_watcher
+from docgen.utils.yml import to_yml
+
+logger = logging.getLogger(__name__)
+
+MARKDOWN_SUFFIXES = (".md", ".qmd")
+
+
+class WatchSession:
+    """
+    Session `docgen watch` : un pré-rendu complet au lancement, puis à chaque modification
+    du source_dir, des classeurs référencés ou du _variables.yml :
+    - mirror des seuls fichiers modifiés
+    - pré-rendu (jinja, outputs) des seuls documents concernés
+    Le rendu est assuré par un `quarto preview` lancé une fois pour toutes dans le build_dir,
+    qui détecte lui-même les fichiers réécrits.
+
+    Parameters:
+        renderer (Renderer): renderer du projet, un seul type de projet et un seul format sont prévisualisés
+        preview_args (list[str], optional): arguments supplémentaires passés à `quarto preview`
+        polling (bool): si True, surveillance par scrutation même si watchdog est installé
+        context (dict, optional): variables ajoutées au _variables.yml
+    """
+
+    def __init__(self, renderer: Renderer, preview_args: list[str] = None, polling: bool = False, context: dict = None):
+        self.renderer = renderer
+        self.preview_args = preview_args or []
+        self.polling = polling
+        self.context = context or {}
+        self.type_renderer = None
+        self.process = None
+        self.watcher = None
+        self._ignored = []
+
+    @property
+    def project_type(self) -> str:
+        return self.renderer.project_types[0]
+
+    def prepare(self):
+        """
+        Pré-rendu complet du build_dir, comme pour Renderer.render().
+        """
+        r = self.renderer
+        logger.info(f"Préparation de la prévisualisation : {r.build_dir}")
+        r.validate_persistent_state()
+        r.mirror_src()
+        r.set_variables_yml(self.context)
+        if 'user' not in r.project_types:
+            r.add_extension()
+        r.pre_render()
+        self.write_quarto_yml()
+
+    def write_quarto_yml(self):
+        """
+        Ecrit dans le build_dir le _quarto.yml du type de projet prévisualisé.
+        """
+        from docgen.renderers.type.abstract import TypeRenderer
+        r = self.renderer
+        r.prepare_quarto_yml()
+        self.type_renderer = TypeRenderer.from_type(r, self.project_type, r.formats)
+        params = self.type_renderer.prepare_quarto_yml_content()
+        # quarto preview n'accepte pas --output-dir
+        params.setdefault("project", {})["output-dir"] = self.type_renderer.sub_output_dir
+        to_yml(r.build_dir / "_quarto.yml", params)
+
+    def preview_cmd(self) -> list[str]:
+        cmd = ["preview"]
+        if "--to" not in self.preview_args:
+            cmd.extend(["--to", self.renderer.formats[0]])
+        cmd.extend(self.preview_args)
+        return cmd
+
+    def start_preview(self):
+        logger.info(f"Lancement de quarto preview dans {self.renderer.build_dir}")
+        self.process = quarto_popen(self.preview_cmd(), cwd=str(self.renderer.build_dir))
+
+    def stop_preview(self):
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    def restart_preview(self):
+        self.stop_preview()
+        self.start_preview()
+
+    def ignore(self, path: Path) -> bool:
+        """
+        Chemins du source_dir à ne pas surveiller : build_dir et dossiers de sortie.
+        """
+        return any(path == d or d in path.parents for d in self._ignored)
+
+    def external_dependencies(self) -> list[Path]:
+        """
+        Fichiers lus par les outputs (classeurs, images) hors du source_dir.
+        """
+        source_dir = self.renderer.source_dir
+        return [p for p in self.renderer.parsed_items.dependencies if source_dir not in Path(p).parents]
+
+    def affected_documents(self, changes: set[Path]) -> set[Path]:
+        """
+        Fichiers markdown du build_dir à pré-rendre suite aux modifications changes (chemins absolus).
+        """
+        r = self.renderer
+        result = set()
+        for p in changes:
+            if p.suffix in MARKDOWN_SUFFIXES and r.source_dir in p.parents and p.is_file():
+                result.add(r.build_dir / p.relative_to(r.source_dir))
+        for document, dependencies in r.parsed_items.document_dependencies.items():
+            if dependencies & changes:
+                result.add(document)
+        return result
+
+    def handle(self, changes: set[Path]):
+        """
+        Répercute les modifications sur le build_dir.
+        """
+        r = self.renderer
+        changes = {Path(p).resolve() for p in changes}
+        relative_paths = []
+        for p in changes:
+            try:
+                relative_paths.append(p.relative_to(r.source_dir))
+            except ValueError:
+                continue
+        logger.info(f"Modifications détectées : {', '.join(sorted(p.name for p in changes))}")
+
+        # Les documents markdown existants sont écrits par le pré-rendu, inutile de les copier ;
+        # _quarto.yml et _variables.yml sont réécrits depuis la source
+        r.mirror_changes([rel for rel in relative_paths
+                          if not (rel.suffix in MARKDOWN_SUFFIXES and (r.source_dir / rel).is_file())
+                          and rel.as_posix() not in WRITTEN_FROM_SOURCE])
+
+        documents = self.affected_documents(changes)
+        if Path("_variables.yml") in relative_paths:
+            r.set_variables_yml(self.context)
+            if r.pre_render_jinja:
+                documents = set(r.build_markdown_files())
+        if documents:
+            logger.info(f"Pré-rendu de {len(documents)} document(s)")
+            r.pre_render(files=sorted(documents))
+            self.watcher.update_files(self.external_dependencies())
+
+        if Path("_quarto.yml") in relative_paths or self.process.poll() is not None:
+            r._persistent_state_key = None
+            if not r.validate_persistent_state():
+                # L'état persistant a été supprimé : fichiers de la source qu'il contenait et extension
+                r.mirror_src()
+                if 'user' not in r.project_types:
+                    r.add_extension()
+            self.write_quarto_yml()
+            self.restart_preview()
+
+    def run(self):
+        r = self.renderer
+        self.prepare()
+        self.start_preview()
+
+        self._ignored = [r.build_dir, r.output_dir]
+        for d in r.source_dir.iterdir():
+            if d.is_dir() and (d / PREVENT_OUTPUT_DIR_MIRROR_FILE).exists():
+                self._ignored.append(d)
+        self.watcher = make_watcher(
+            [r.source_dir],
+            files=self.external_dependencies(),
+            ignore=self.ignore,
+            polling=self.polling,
+            interval=settings.watch_interval,
+            debounce=settings.watch_debounce)
+        logger.info(f"Surveillance de {r.source_dir} (Ctrl+C pour arrêter)")
+        try:
+            while True:
+                changes = self.watcher.wait()
+                try:
+                    self.handle(changes)
+                except Exception as e:
+                    logger.exception(f"Erreur lors du pré-rendu : {e}")
+        except KeyboardInterrupt:
+            logger.info("Arrêt de la surveillance")
+        finally:
+            self.watcher.close()
+            self.stop_preview()
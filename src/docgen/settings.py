@@ -25,6 +25,9 @@ _ENV_PREFIX = "DYNOTEC_"
 _DEFAULT_FORMATS = ["html"]
 _AVAILABLE_FORMATS = ["pdf", "docx", "html"]
 
+_TRANSFER_STRATEGIES = ["hardlink", "reflink", "sendfile", "copy"]
+_TRANSFER_LINK_SUFFIXES = [".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".bmp", ".tif", ".tiff", ".pdf"]
+
 _DEFAULT_PROJECT_TYPES = ["default"]
 _AVAILABLE_PROJECT_TYPES = ["default", "website", "book","manuscript","user"]
 
@@ -67,6 +70,32 @@ class DynotecSettings(BaseSettings):
     default_output_dir_name: str = "docgen_output"
 
     build_dir_name: str|None = None
+    render_cache: bool = True
+
+    # Synchronisation (mirror)
+    transfer_strategies: str = ",".join(_TRANSFER_STRATEGIES)
+    transfer_link_suffixes: str = ",".join(_TRANSFER_LINK_SUFFIXES)
+    transfer_workers: int = 8
+    image_store: bool = True # images hors source liées depuis un magasin adressé par contenu (dynotec_home/store)
+
+    # Variantes d'images par format (Pillow, extra images)
+    image_variants: bool = True
+    image_html_max_width: int = 1600 # pixels
+    image_pdf_dpi: int = 300 # résolution sur une largeur de page de 6.5 pouces
+    image_docx_max_width: int = 1400 # pixels
+    image_variant_quality: int = 85 # qualité webp et jpeg
+
+    # Excel
+    excel_read_only: bool = True # lecture seule (valeurs calculées, sans styles) des classeurs via openpyxl
+    excel_reader: str = "openpyxl" # lecteur des valeurs : openpyxl, stream (flux XML, arrêt après la dernière ligne)
+    excel_cache_memory_mb: int = 2048 # budget mémoire (estimé) des classeurs ouverts simultanément
+    excel_workers: int = 1 # processus pour l'extraction des classeurs, un classeur par processus
+    excel_block_cache: bool = True # cache disque des valeurs lues dans les feuilles, partagé entre rendus et projets
+    excel_block_cache_max_entries: int = 256
+
+    # docgen watch
+    watch_interval: float = 1.0 # période de scrutation (sans watchdog) en secondes
+    watch_debounce: float = 0.3 # regroupement des notifications en secondes
 
     def _enforce_list(self,value)->list[str]:
         if value is None:
@@ -101,6 +130,18 @@ class DynotecSettings(BaseSettings):
         """
         return self._enforce_list(self.default_project_types)
 
+    def get_transfer_strategies(self) -> list[str]:
+        """
+        Retourne les stratégies de transfert de fichiers, dans l'ordre où elles sont essayées.
+        """
+        return [s.strip() for s in self.transfer_strategies.split(",") if s.strip()]
+
+    def get_transfer_link_suffixes(self) -> list[str]:
+        """
+        Retourne les suffixes des fichiers pouvant être liés (hardlink) lors d'un mirror.
+        """
+        return self._enforce_list(self.transfer_link_suffixes)
+
 
 
 
@@ -0,0 +1,37 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+
+
+def fingerprint(*parts) -> str:
+    """
+    Calcule une empreinte sha256 à partir d'éléments sérialisables en json (octets pris tels quels).
+    Les autres valeurs (dates, dataclasses, ...) sont sérialisées par repr : une date et
+    sa représentation textuelle ont des empreintes différentes.
+    """
+    hasher = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            hasher.update(part)
+        else:
+            hasher.update(json.dumps(part, sort_keys=True, default=repr).encode("utf-8"))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def stat_state(st: os.stat_result) -> list[int]:
+    """
+    (mtime_ns, taille) d'un résultat de stat : état d'un fichier comparé d'un rendu à l'autre.
+    """
+    return [st.st_mtime_ns, st.st_size]
+
+
+def file_state(path: Path) -> list[int]:
+    """
+    (mtime_ns, taille) du fichier, None s'il n'existe pas.
+    """
+    try:
+        return stat_state(os.stat(path))
+    except OSError:
+        return None
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+import logging
+from typing import Any, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBoundedLRU:
+    """
+    Cache LRU borné par un budget mémoire : chaque entrée a une taille (estimée ou mesurée) et les entrées
+    les moins récemment utilisées sont fermées puis évincées tant que le total dépasse le budget.
+    L'entrée la plus récente est toujours conservée, même si elle dépasse seule le budget.
+
+    Parameters:
+        budget (int): budget mémoire en octets
+        close (Callable[[Any], None], optional): appelé sur chaque valeur évincée ou retirée
+    """
+
+    def __init__(self, budget: int, close: Callable[[Any], None] = None):
+        self.budget = budget
+        self._close = close or (lambda value: None)
+        self._items: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable, load: Callable[[], Any], estimate: Callable[[], int]) -> Any:
+        """
+        Valeur de key, chargée par load() si absente ; estimate() donne sa taille en octets.
+        """
+        if key in self._items:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key][0]
+        self.misses += 1
+        value = load()
+        size = max(0, int(estimate()))
+        self._items[key] = (value, size)
+        self.size += size
+        self._evict()
+        return value
+
+    def _evict(self):
+        while self.size > self.budget and len(self._items) > 1:
+            key, (value, size) = self._items.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            logger.debug(f"Eviction du cache : {key} ({size / 2**20:.0f} Mo)")
+            self._safe_close(value)
+
+    def discard(self, key: Hashable):
+        if key in self._items:
+            value, size = self._items.pop(key)
+            self.size -= size
+            self._safe_close(value)
+
+    def _safe_close(self, value):
+        try:
+            self._close(value)
+        except Exception as e:
+            logger.warning(f"Error closing cached value: {e}")
+
+    def clear(self):
+        """
+        Ferme et retire toutes les valeurs ; les compteurs sont conservés.
+        """
+        while self._items:
+            _, (value, _) = self._items.popitem(last=False)
+            self._safe_close(value)
+        self.size = 0
+
+    def stats(self) -> str:
+        return f"{self.hits} réutilisation(s), {self.misses} chargement(s), {self.evictions} éviction(s)"
@@ -1,41 +1,171 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import copy
+from dataclasses import asdict, dataclass, field
+import json
 import logging
+import os
 from pathlib import Path
 import shutil
 
-from docgen.utils.path import has_been_modified
+from docgen.settings import settings
+from docgen.utils.path import has_been_modified, hash_file_content
+from docgen.utils.transfer import Transfer
 from tqdm import tqdm
 
 
 logger = logging.getLogger(__name__)
 
-class _BarController:
-    def __init__(self,bar):
-        self.bar = bar
-        self.counter = 0
-        self.next_total = None
-
-    def update(self,message:str=None,next_total=None):
-        if message:
-            self.bar.set_description(message)
-        if next_total is not None:
-            self.end()
-            self.next_total = next_total
-            self.counter = 0
-        elif self.counter<self.next_total:
-            self.counter += 1
-            self.bar.update(1)
-
-    def end(self):
-        if self.next_total is None:
-            return
-        self.bar.update(self.next_total - self.counter)
-
-def mirror(source_dir:Path,dest_dir:Path,rm_orphans:bool=True,excluded: list[Path] = None,kept_orphans: list[Path] = None):
+@dataclass
+class FileState:
+    """
+    Etat d'un élément de source_dir lors du dernier mirror.
+    """
+    size: int = 0
+    mtime_ns: int = 0
+    inode: int = 0
+    is_dir: bool = False
+    digest: str = None
+
+    @classmethod
+    def from_stat(cls, st: os.stat_result) -> 'FileState':
+        return cls(size=st.st_size, mtime_ns=st.st_mtime_ns, inode=st.st_ino)
+
+    def same_stat(self, other: 'FileState') -> bool:
+        return (self.size, self.mtime_ns, self.inode) == (other.size, other.mtime_ns, other.inode)
+
+
+class MirrorManifest:
+    """
+    Manifest persistant d'un mirror : chemin relatif (posix) -> FileState.
+
+    Permet de détecter les fichiers modifiés et orphelins par différence avec le mirror
+    précédent, sans parcourir dest_dir ni relire les fichiers de destination.
+    """
+    VERSION = 1
+
+    def __init__(self, path: Path, source_dir: Path, dest_dir: Path):
+        self.path = Path(path)
+        self.source_dir = source_dir
+        self.dest_dir = dest_dir
+        self.entries: dict[str, FileState] = {}
+        self.valid = False
+
+    @classmethod
+    def load(cls, path: Path, source_dir: Path, dest_dir: Path) -> 'MirrorManifest':
+        result = cls(path, source_dir, dest_dir)
+        if not result.path.exists():
+            return result
+        try:
+            data = json.loads(result.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Manifest illisible {result.path}: {e}")
+            return result
+        if (data.get("version") != cls.VERSION
+                or data.get("source_dir") != str(source_dir)
+                or data.get("dest_dir") != str(dest_dir)):
+            return result
+        result.entries = {k: FileState(**v) for k, v in data.get("entries", {}).items()}
+        result.valid = True
+        return result
+
+    def save(self):
+        data = {
+            "version": self.VERSION,
+            "source_dir": str(self.source_dir),
+            "dest_dir": str(self.dest_dir),
+            "entries": {k: asdict(v) for k, v in self.entries.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class MirrorResult:
+    """
+    Chemins relatifs (posix) copiés et supprimés lors d'un mirror, et manifest à jour le cas échéant.
+    """
+    copied: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    manifest: MirrorManifest = None
+
+
+def _scan(source_dir: Path, dest_dir: Path, excluded: set[str]):
+    """
+    Parcours de source_dir via os.scandir, un seul stat par fichier.
+    Yield (chemin relatif posix, DirEntry, stat_result ou None pour un dossier)
+    """
+    stack = [(str(source_dir), "")]
+    dest = str(dest_dir)
+    while stack:
+        current, prefix = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError as e:
+            logger.warning(f"Erreur lecture répertoire {current}: {e}")
+            continue
+        with it:
+            for entry in it:
+                if entry.path == dest or entry.path in excluded:
+                    continue
+                relative_path = prefix + entry.name
+                try:
+                    if entry.is_dir():
+                        yield relative_path, entry, None
+                        stack.append((entry.path, relative_path + "/"))
+                    elif entry.is_file():
+                        yield relative_path, entry, entry.stat()
+                except OSError as e:
+                    logger.warning(f"Erreur lecture {relative_path}: {e}")
+
+
+def _target_missing(target: Path) -> bool:
+    """
+    Cible supprimée hors du mirror. Son contenu n'est pas comparé : le pré-rendu réécrit
+    les documents du build_dir.
+    """
+    try:
+        os.lstat(target)
+    except OSError:
+        return True
+    return False
+
+
+def _is_kept(relative_path: str, kept: list[str]) -> bool:
+    return any(relative_path == k or relative_path.startswith(k + "/") for k in kept)
+
+
+def default_transfer() -> Transfer:
+    """
+    Stratégie de transfert par défaut, selon les settings.
+    """
+    return Transfer(strategies=settings.get_transfer_strategies(),
+                    link_suffixes=settings.get_transfer_link_suffixes())
+
+
+def mirror(source_dir:Path,dest_dir:Path,rm_orphans:bool=True,excluded: list[Path] = None,kept_orphans: list[Path] = None,
+           manifest: Path = None, digest: bool = False, transfer: Transfer = None, workers: int = None) -> MirrorResult:
+    """
+    Synchronise source_dir vers dest_dir.
+
+    Parameters:
+        rm_orphans (bool): supprime de dest_dir les éléments absents de source_dir
+        excluded (list[Path]): éléments de source_dir ignorés
+        kept_orphans (list[Path]): éléments de dest_dir jamais supprimés
+        manifest (Path, optional): fichier de manifest persistant. Si valide, la détection des
+            modifications et des orphelins se fait par différence avec celui-ci.
+        digest (bool): enregistre l'empreinte sha256 des fichiers dans le manifest ; un fichier
+            dont seul le stat a changé n'est alors pas recopié.
+        transfer (Transfer, optional): stratégie de transfert des fichiers (par défaut selon les settings)
+        workers (int, optional): nombre de copies simultanées (par défaut settings.transfer_workers)
+    """
     _kept_orphans = copy.deepcopy(kept_orphans) or None
-    # === DETERMINER LE REPERTOIRE SOURCE === 
+    transfer = transfer or default_transfer()
+    # === DETERMINER LE REPERTOIRE SOURCE ===
     # === VÉRIFICATION CONFLIT FICHIER/DOSSIER ===
-    """ 
+    """
     Problème évité : Si un FICHIER nommé .build existe, mkdir() plante
     Solution : Détecter le conflit et donner un message clair à l'utilisateur """
     if dest_dir.exists() and dest_dir.is_file():
@@ -48,77 +178,131 @@ def mirror(source_dir:Path,dest_dir:Path,rm_orphans:bool=True,excluded: list[Pat
 
     if not source_dir.exists():
         raise FileNotFoundError(f"Le répertoire source '{source_dir}' n'existe pas.")
-    
-    
+
+    previous = None
+    if manifest is not None:
+        previous = MirrorManifest.load(manifest, source_dir, dest_dir)
+        current = MirrorManifest(manifest, source_dir, dest_dir)
+    result = MirrorResult()
+    seen = set()
+
     # === COPIE RÉCURSIVE AVEC EXCLUSIONS ===
     logger.info(f"Synchronisation de {source_dir}")
     logger.info(f"\t vers {dest_dir}")
 
-    with tqdm(desc="... synchronisation",total=100) as synchronize_bar:
-        bar_controller = _BarController(synchronize_bar)
-        bar_controller.update(next_total=50)
-
-
-        """
-        Conditions de copie :
-        1. Fichier n'existe pas dans .build/ -> COPIER (nouveau)
-        2. Fichier source plus récent -> COPIER (modifié)
-        3. Fichier identique/plus ancien -> IGNORER (économie)
-        
-        st_mtime = timestamp de dernière modification
-        Plus le nombre est grand = plus récent
-        
-        Exemples :
-        - source mtime=1000, build mtime=800 -> 1000 > 800 = True -> COPIER
-        - source mtime=500, build mtime=600 -> 500 > 600 = False -> IGNORER
-        """
-        def _recursive_copy(current_source):
-            for item in current_source.iterdir():
-                if item == dest_dir or dest_dir in item.parents:
-                    continue
-                if excluded and item in excluded:
+    """
+    Conditions de copie :
+    1. Fichier n'existe pas dans .build/ -> COPIER (nouveau)
+    2. Fichier source plus récent -> COPIER (modifié)
+    3. Fichier identique/plus ancien -> IGNORER (économie)
+
+    st_mtime = timestamp de dernière modification
+    Plus le nombre est grand = plus récent
+
+    Avec un manifest valide, 2. et 3. sont remplacés par la comparaison
+    (taille, mtime_ns, inode) avec l'état enregistré lors du mirror précédent,
+    et 1. par un lstat de la cible.
+    """
+    tasks = [] # (chemin relatif, source, cible, état, à copier)
+    _excluded = {str(p) for p in excluded or []}
+    for relative_path, entry, st in _scan(source_dir, dest_dir, _excluded):
+        target = dest_dir / relative_path
+        seen.add(relative_path)
+        known = previous.entries.get(relative_path) if previous is not None and previous.valid else None
+        if st is None:
+            if previous is not None:
+                current.entries[relative_path] = FileState(is_dir=True)
+            if known is not None and known.is_dir and target.is_dir():
+                continue
+            try:
+                target.mkdir(parents=True, exist_ok=True)
+            except Exception as e:
+                logger.warning(f"Erreur création répertoire {relative_path}: {e}")
+            continue
+
+        # pour chaque fichier différentielle
+        state = FileState.from_stat(st)
+        if previous is not None and previous.valid:
+            to_copy = known is None or known.is_dir or not state.same_stat(known)
+            if to_copy and digest and known is not None and known.digest is not None:
+                state.digest = hash_file_content(entry.path)
+                to_copy = state.digest != known.digest
+            elif not to_copy:
+                state.digest = known.digest
+            # Le build_dir a pu être modifié hors du mirror (suppression par l'utilisateur, ...)
+            to_copy = to_copy or _target_missing(target)
+        else:
+            to_copy = not target.exists() or has_been_modified(Path(entry.path), target, hash=False)
+
+        if to_copy or (digest and state.digest is None):
+            tasks.append((relative_path, entry.path, target, state, to_copy))
+        elif previous is not None:
+            current.entries[relative_path] = state
+
+    def _process(src, target, state, to_copy):
+        if digest and state.digest is None:
+            state.digest = hash_file_content(src)
+        if to_copy:
+            logger.debug(f"{src} -> {target}")
+            target.parent.mkdir(parents=True, exist_ok=True)
+            return transfer.copy(src, target)
+
+    # Copies simultanées, la progression est exprimée en octets copiés
+    strategies = Counter()
+    total = sum(state.size for _, _, _, state, to_copy in tasks if to_copy)
+    with tqdm(desc="... synchronisation", total=total, unit="B", unit_scale=True, unit_divisor=1024) as synchronize_bar, \
+            ThreadPoolExecutor(max_workers=workers or settings.transfer_workers) as pool:
+        futures = {pool.submit(_process, src, target, state, to_copy): (relative_path, state, to_copy)
+                   for relative_path, src, target, state, to_copy in tasks}
+        for future in as_completed(futures):
+            relative_path, state, to_copy = futures[future]
+            try:
+                strategy = future.result()
+            except Exception as e:
+                logger.warning(f"Erreur copie {relative_path}: {e}")
+                continue
+            if to_copy:
+                strategies[strategy] += 1
+                synchronize_bar.update(state.size)
+                result.copied.append(relative_path)
+                logger.debug(f"Copié: {relative_path}")
+            if previous is not None:
+                current.entries[relative_path] = state
+    if strategies:
+        logger.debug(f"Stratégies de transfert : {dict(strategies)}")
+
+    # pour chaque fichier .build supprimé dans src on propage la suppression
+
+    # === DÉTECTION DES FICHIERS ORPHELINS ===
+    """
+    Principe : Tout fichier dans .build/ DOIT avoir un équivalent dans source.
+            Si un fichier existe dans .build/ mais plus dans source -> orphelin à supprimer.
+
+    Méthode (logique inverse) :
+    1. Parcourir TOUS les éléments de build_dir/ (fichiers + dossiers)
+    2. Pour chaque élément :
+    - Calculer son chemin relatif par rapport à .build/
+    - Reconstruire le chemin équivalent dans source
+    - Vérifier si cet équivalent existe encore
+    - Si NON -> ajouter à la liste de suppression
+
+    Avec un manifest valide, les orphelins sont les éléments du manifest précédent
+    absents du parcours de source_dir : build_dir n'est pas parcouru.
+    """
+    if rm_orphans:
+        items_to_remove = []
+        if previous is not None and previous.valid:
+            kept = []
+            for p in _kept_orphans or []:
+                try:
+                    kept.append(Path(p).relative_to(dest_dir).as_posix())
+                except ValueError:
+                    pass
+            for relative_path in sorted(previous.entries.keys() - seen):
+                if _is_kept(relative_path, kept):
                     continue
-                relative_path = item.relative_to(source_dir)
-                target = dest_dir / relative_path
-                logger.debug(f"{item} -> {target}")
-                bar_controller.update()
-                if item.is_file():
-                    # pour chaque fichier différentielle
-                    if not target.exists() or has_been_modified(item, target, hash=False):
-                        try:
-                            target.parent.mkdir(parents=True, exist_ok=True)
-                            shutil.copy2(item, target) # Copy métadata dont mtime pour la bonne comparaison
-                            logger.debug(f"Copié: {relative_path}")
-                        except Exception as e:
-                            logger.warning(f"Erreur copie {relative_path}: {e}")
-                elif item.is_dir():
-                    try:
-                        target.mkdir(parents=True, exist_ok=True)
-                    except Exception as e:
-                        logger.warning(f"Erreur création répertoire {relative_path}: {e}")
-                    _recursive_copy(item)  # Appel récursif pour les sous-répertoires
-
-
-        _recursive_copy(source_dir)
-        
-        # pour chaque fichier .build supprimé dans src on propage la suppression 
-        
-        # === DÉTECTION DES FICHIERS ORPHELINS ===
-        """
-        Principe : Tout fichier dans .build/ DOIT avoir un équivalent dans source.
-                Si un fichier existe dans .build/ mais plus dans source -> orphelin à supprimer.
-        
-        Méthode (logique inverse) :
-        1. Parcourir TOUS les éléments de build_dir/ (fichiers + dossiers)
-        2. Pour chaque élément :
-        - Calculer son chemin relatif par rapport à .build/
-        - Reconstruire le chemin équivalent dans source  
-        - Vérifier si cet équivalent existe encore
-        - Si NON -> ajouter à la liste de suppression
-        """
-        bar_controller.update(next_total=50)
-        if rm_orphans:
-            items_to_remove = []
+                items_to_remove.append((dest_dir / relative_path, relative_path))
+        else:
             for item in dest_dir.rglob("*"):
                 if _kept_orphans and item in _kept_orphans:
                     continue
@@ -128,30 +312,116 @@ def mirror(source_dir:Path,dest_dir:Path,rm_orphans:bool=True,excluded: list[Pat
                     continue
                 relative_path = item.relative_to(dest_dir)
                 source_item = source_dir / relative_path
-                
+
                 if not source_item.exists():
-                    items_to_remove.append((item, relative_path))
+                    items_to_remove.append((item, relative_path.as_posix()))
 
-            # Supprimer d'abord les fichiers, puis les répertoires (ordre important)
-            for item, relative_path in filter(lambda x:x[0].is_file(), items_to_remove):
-                logger.debug(f"rm {relative_path}")
-                bar_controller.update()
-                try:
-                    item.unlink()
-                except Exception as e:
-                    logger.warning(f"Erreur suppression {relative_path}: {e}")
+        # Supprimer d'abord les fichiers, puis les répertoires (ordre important)
+        for item, relative_path in filter(lambda x:x[0].is_file(), items_to_remove):
+            logger.debug(f"rm {relative_path}")
+            try:
+                item.unlink()
+                result.removed.append(relative_path)
+            except Exception as e:
+                logger.warning(f"Erreur suppression {relative_path}: {e}")
 
-            for item, relative_path in filter(lambda x:x[0].is_dir(), reversed(items_to_remove)): # parcours dans le sens inverse = du plus profond au moins profond
-                logger.debug(f"rm {relative_path}")
-                bar_controller.update()
-                try:
-                    if not any(item.iterdir()):  # Seulement si vide
-                        item.rmdir()
-                except Exception as e:
-                    logger.warning(f"Erreur suppression {relative_path}: {e}")
-        bar_controller.end()
+        for item, relative_path in filter(lambda x:x[0].is_dir(), reversed(items_to_remove)): # parcours dans le sens inverse = du plus profond au moins profond
+            logger.debug(f"rm {relative_path}")
+            try:
+                if not any(item.iterdir()):  # Seulement si vide
+                    item.rmdir()
+                    result.removed.append(relative_path)
+            except Exception as e:
+                logger.warning(f"Erreur suppression {relative_path}: {e}")
+    elif previous is not None and previous.valid:
+        # Les éléments non supprimés restent suivis par le manifest
+        for relative_path in previous.entries.keys() - seen:
+            current.entries[relative_path] = previous.entries[relative_path]
+
+    if previous is not None:
+        current.save()
+        result.manifest = current
+    return result
+
+def mirror_paths(source_dir: Path, dest_dir: Path, relative_paths: list[str], manifest: Path = None,
+                 transfer: Transfer = None) -> MirrorResult:
+    """
+    Synchronise uniquement les chemins relatifs donnés de source_dir vers dest_dir (chemins
+    signalés modifiés par un watcher par exemple) : copie s'ils existent, suppression sinon.
+
+    Le manifest éventuel est mis à jour pour ces seuls chemins, le mirror complet suivant
+    reste incrémental.
+    """
+    source_dir, dest_dir = Path(source_dir), Path(dest_dir)
+    transfer = transfer or default_transfer()
+    current = None
+    if manifest is not None:
+        current = MirrorManifest.load(manifest, source_dir, dest_dir)
+    result = MirrorResult()
+    for relative_path in sorted({Path(p).as_posix() for p in relative_paths}):
+        src, target = source_dir / relative_path, dest_dir / relative_path
+        try:
+            if src.is_file():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                transfer.copy(src, target)
+                result.copied.append(relative_path)
+                if current is not None:
+                    current.entries[relative_path] = FileState.from_stat(src.stat())
+            elif src.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                if current is not None:
+                    current.entries[relative_path] = FileState(is_dir=True)
+            elif target.exists():
+                if target.is_dir():
+                    shutil.rmtree(target)
+                else:
+                    target.unlink()
+                result.removed.append(relative_path)
+                if current is not None:
+                    for key in [k for k in current.entries if _is_kept(k, [relative_path])]:
+                        del current.entries[key]
+        except Exception as e:
+            logger.warning(f"Erreur synchronisation {relative_path}: {e}")
+    if current is not None and current.valid:
+        current.save()
+        result.manifest = current
+    return result
+
+def merge(sources: list[Path], dest_dir: Path, rm_orphans: bool = True, transfer: Transfer = None) -> MirrorResult:
+    """
+    Synchronise plusieurs répertoires sources vers dest_dir : dest_dir contient l'union des sources,
+    en cas de conflit la dernière source l'emporte.
+
+    Les orphelins sont les éléments de dest_dir absents de toutes les sources.
+    """
+    dest_dir = Path(dest_dir)
+    sources = [Path(s) for s in sources]
+    result = MirrorResult()
+    for source_dir in sources:
+        if not source_dir.exists():
+            continue
+        result.copied.extend(mirror(source_dir, dest_dir, rm_orphans=False, transfer=transfer).copied)
+
+    if rm_orphans and dest_dir.exists():
+        # Tri inverse : les éléments d'un répertoire sont traités avant lui
+        for item in sorted(dest_dir.rglob("*"), reverse=True):
+            relative_path = item.relative_to(dest_dir)
+            if any((s / relative_path).exists() for s in sources):
+                continue
+            logger.debug(f"rm {relative_path.as_posix()}")
+            try:
+                if item.is_dir():
+                    if any(item.iterdir()):
+                        continue
+                    item.rmdir()
+                else:
+                    item.unlink()
+                result.removed.append(relative_path.as_posix())
+            except Exception as e:
+                logger.warning(f"Erreur suppression {relative_path}: {e}")
+    return result
 
 if __name__=="__main__":
     from docgen.settings import settings
     logging.basicConfig(level=logging.DEBUG)
-    mirror(settings.examples_path / "minimal_example",settings.examples_path / "minimal_example2")
\ No newline at end of file
+    mirror(settings.examples_path / "minimal_example",settings.examples_path / "minimal_example2")
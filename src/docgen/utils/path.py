@@ -1,6 +1,12 @@
 import hashlib
+import logging
+import os
 from pathlib import Path
 import re
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
 
 
 def hash_path(path: Path,n_hash:int=None,n_parents:int=3) -> str:
@@ -46,6 +52,70 @@ def has_been_modified(path:Path, reference:Path,hash:bool=False):
         return (path.stat().st_mtime > reference.stat().st_mtime)
     return hash_file_content(path) != hash_file_content(reference)
 
+class WriteStats:
+    """
+    Compteurs des écritures de write_if_changed : fichiers écrits, fichiers laissés inchangés.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.written = 0
+        self.skipped = 0
+
+    def count(self, written: bool):
+        with self._lock:
+            if written:
+                self.written += 1
+            else:
+                self.skipped += 1
+
+    def reset(self):
+        with self._lock:
+            self.written = 0
+            self.skipped = 0
+
+    def __str__(self) -> str:
+        return f"{self.written} fichier(s) écrit(s), {self.skipped} inchangé(s)"
+
+
+write_stats = WriteStats()
+
+
+def write_if_changed(path: Path, content: str | bytes, encoding: str = "utf-8") -> bool:
+    """
+    Ecrit content dans path, sauf si le fichier a déjà ce contenu : il n'est alors pas modifié
+    et garde sa date de modification (Quarto et les mirroirs ne le voient pas changer).
+
+    L'écriture passe par un fichier temporaire renommé : un lecteur concurrent ne voit jamais
+    un fichier partiel, et un fichier lié (hardlink) à la destination n'est pas modifié.
+
+    Returns:
+        bool: True si le fichier a été écrit
+    """
+    path = Path(path)
+    data = content.encode(encoding) if isinstance(content, str) else content
+    try:
+        # Comparaison des tailles d'abord : le fichier n'est relu que s'il peut être identique
+        unchanged = path.stat().st_size == len(data) and path.read_bytes() == data
+    except FileNotFoundError:
+        unchanged = False
+    if unchanged:
+        write_stats.count(False)
+        return False
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+    write_stats.count(True)
+    logger.debug(f"Fichier écrit : {path}")
+    return True
+
 def sanitize_path_part(path_part: str,extra_prohibited_chars: str="") -> str:
     """
     Remove or replace prohibited symbols from a path part.
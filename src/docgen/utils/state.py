@@ -0,0 +1,91 @@
+import json
+import logging
+from pathlib import Path
+import shutil
+
+logger = logging.getLogger(__name__)
+
+STATE_PATH_IN_BUILD_DIR = ".docgen"
+STATE_FILE = "state.json"
+
+
+class PersistentState:
+    """
+    Etat persistant d'un build_dir : chemins conservés d'un rendu à l'autre
+    (état incrémental de Quarto, extensions installées, ...) et leur invalidation.
+
+    Le mirror ne supprime jamais ces chemins. Ils ne sont supprimés que si l'empreinte
+    passée à validate diffère de celle enregistrée lors du rendu précédent.
+
+    Parameters:
+        manifests (list[str]): manifests de mirror du dossier d'état, supprimés avec les chemins
+            persistants : les fichiers de la source mirrorés dans ces chemins sont recopiés au
+            mirror suivant.
+    """
+
+    def __init__(self, build_dir: Path, paths: list[str] = None, manifests: list[str] = None):
+        self.build_dir = Path(build_dir)
+        self.relative_paths = sorted(set(paths or []))
+        self.manifests = list(manifests or [])
+
+    @property
+    def state_dir(self) -> Path:
+        return self.build_dir / STATE_PATH_IN_BUILD_DIR
+
+    @property
+    def state_file(self) -> Path:
+        return self.state_dir / STATE_FILE
+
+    def paths(self) -> list[Path]:
+        """
+        Chemins absolus à conserver dans le build_dir, y compris le dossier d'état lui-même.
+        """
+        return [self.state_dir] + [self.build_dir / p for p in self.relative_paths]
+
+    def read(self) -> dict:
+        if not self.state_file.exists():
+            return {}
+        try:
+            return json.loads(self.state_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Etat persistant illisible {self.state_file}: {e}")
+            return {}
+
+    def write(self, data: dict):
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.state_file.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+
+    def clear(self):
+        """
+        Supprime les chemins persistants (hors dossier d'état) et les manifests de mirror.
+        """
+        for name in self.manifests:
+            (self.state_dir / name).unlink(missing_ok=True)
+        for p in self.relative_paths:
+            p = self.build_dir / p
+            try:
+                if p.is_dir():
+                    shutil.rmtree(p)
+                elif p.exists():
+                    p.unlink()
+            except Exception as e:
+                logger.warning(f"Erreur suppression {p}: {e}")
+
+    def validate(self, key: str) -> bool:
+        """
+        Compare l'empreinte key à celle du rendu précédent.
+        Si elles diffèrent, l'état persistant est supprimé et la nouvelle empreinte enregistrée.
+
+        Returns:
+            bool: True si l'état persistant est réutilisable.
+        """
+        data = self.read()
+        if data.get("key") == key:
+            logger.debug(f"Etat persistant valide dans {self.build_dir}")
+            return True
+        if data:
+            logger.info("Quarto, l'extension docgen ou le _quarto.yml ont changé : état incrémental réinitialisé")
+        self.clear()
+        data["key"] = key
+        self.write(data)
+        return False
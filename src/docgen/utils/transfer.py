@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+import logging
+import os
+from pathlib import Path
+import shutil
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+HARDLINK = "hardlink"
+REFLINK = "reflink"
+SENDFILE = "sendfile"
+COPY = "copy"
+
+AVAILABLE_STRATEGIES = [HARDLINK, REFLINK, SENDFILE, COPY]
+
+_FICLONE = 0x40049409 # ioctl linux de clonage (btrfs, xfs, ...)
+_COPY_BUFSIZE = 1024 * 1024
+
+
+def _tmp_path(dst: Path) -> Path:
+    return dst.with_name(f".{dst.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def _hardlink(src: Path, tmp: Path):
+    os.link(src, tmp)
+
+
+def _reflink(src: Path, tmp: Path):
+    with open(src, "rb") as fsrc, open(tmp, "wb") as fdst:
+        if sys.platform.startswith("linux"):
+            import fcntl
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                return
+            except OSError:
+                pass
+        if not hasattr(os, "copy_file_range"):
+            raise OSError("copy_file_range non disponible")
+        size = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        while offset < size:
+            n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - offset, offset, offset)
+            if n == 0:
+                break
+            offset += n
+        if offset < size:
+            raise OSError("copy_file_range incomplet")
+
+
+def _sendfile(src: Path, tmp: Path):
+    if not sys.platform.startswith("linux"):
+        # os.sendfile n'accepte un fichier en destination que sous linux
+        raise OSError("sendfile non supporté")
+    with open(src, "rb") as fsrc, open(tmp, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        while offset < size:
+            n = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+            if n == 0:
+                break
+            offset += n
+        if offset < size:
+            raise OSError("sendfile incomplet")
+
+
+def _copy(src: Path, tmp: Path):
+    with open(src, "rb") as fsrc, open(tmp, "wb") as fdst:
+        shutil.copyfileobj(fsrc, fdst, length=_COPY_BUFSIZE)
+
+
+_STRATEGIES = {
+    HARDLINK: _hardlink,
+    REFLINK: _reflink,
+    SENDFILE: _sendfile,
+    COPY: _copy,
+}
+
+
+@dataclass
+class Transfer:
+    """
+    Stratégie de transfert d'un fichier : les stratégies sont essayées dans l'ordre
+    jusqu'à la première qui réussit (hardlink, reflink/copy_file_range, sendfile, copie bufferisée).
+
+    Le fichier est écrit dans un fichier temporaire puis renommé : la destination n'est jamais
+    modifiée en place, ce qui ne peut donc pas altérer un fichier auquel elle serait liée.
+
+    Parameters:
+        strategies (list[str]): stratégies à essayer, dans l'ordre
+        link_suffixes (list[str], optional): suffixes des fichiers pouvant être liés (hardlink).
+            Si None, tous les fichiers peuvent l'être. Un fichier lié partage son contenu avec la
+            source : il ne doit pas être modifié en place dans la destination.
+    """
+    strategies: list[str] = field(default_factory=lambda: list(AVAILABLE_STRATEGIES))
+    link_suffixes: list[str] = None
+
+    def __post_init__(self):
+        unknown = set(self.strategies) - set(AVAILABLE_STRATEGIES)
+        if unknown:
+            raise ValueError(f"Stratégies de transfert inconnues {unknown}. Choisir parmi {AVAILABLE_STRATEGIES}")
+        if self.link_suffixes is not None:
+            self.link_suffixes = {s.lower() for s in self.link_suffixes}
+
+    def strategies_for(self, src: Path) -> list[str]:
+        result = self.strategies
+        if HARDLINK in result and self.link_suffixes is not None and Path(src).suffix.lower() not in self.link_suffixes:
+            result = [s for s in result if s != HARDLINK]
+        return result
+
+    def copy(self, src: Path, dst: Path) -> str:
+        """
+        Copie src vers dst (métadonnées dont mtime comprises).
+
+        Returns:
+            str: la stratégie retenue
+        """
+        src, dst = Path(src), Path(dst)
+        tmp = _tmp_path(dst)
+        errors = []
+        for name in self.strategies_for(src):
+            try:
+                _STRATEGIES[name](src, tmp)
+                if name != HARDLINK:
+                    shutil.copystat(src, tmp)
+                os.replace(tmp, dst)
+                return name
+            except (OSError, AttributeError) as e:
+                errors.append(f"{name}: {e}")
+                try:
+                    tmp.unlink()
+                except FileNotFoundError:
+                    pass
+        raise OSError(f"Echec du transfert {src} -> {dst} ({'; '.join(errors)})")
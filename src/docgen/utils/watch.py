@@ -0,0 +1,181 @@
+import logging
+import os
+from pathlib import Path
+import queue
+import threading
+import time
+from typing import Callable
+
+from docgen.utils.hashing import stat_state
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+
+class PollingWatcher:
+    """
+    Surveillance de fichiers par comparaison périodique de (mtime_ns, taille).
+
+    Parameters:
+        roots (list[Path]): dossiers surveillés récursivement
+        files (list[Path]): fichiers surveillés hors de roots (classeurs externes, ...)
+        ignore (Callable[[Path], bool], optional): chemins à ignorer (dossiers de sortie, ...)
+        interval (float): période de scrutation en secondes
+    """
+
+    def __init__(self, roots: list[Path], files: list[Path] = None, ignore: Callable[[Path], bool] = None,
+                 interval: float = 1.0):
+        self.roots = [Path(r) for r in roots]
+        self.files = set()
+        self.ignore = ignore or (lambda p: False)
+        self.interval = interval
+        self.update_files(files or [])
+        self._snapshot = self.snapshot()
+
+    def update_files(self, files: list[Path]):
+        self.files = {Path(f) for f in files}
+
+    def _walk(self, root: Path):
+        stack = [str(root)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if self.ignore(Path(entry.path)):
+                            continue
+                        if entry.is_dir():
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry.path, entry.stat()
+            except OSError:
+                continue
+
+    def snapshot(self) -> dict[str, list[int]]:
+        result = {}
+        for root in self.roots:
+            for path, st in self._walk(root):
+                result[path] = stat_state(st)
+        for p in self.files:
+            try:
+                result[str(p)] = stat_state(p.stat())
+            except OSError:
+                continue
+        return result
+
+    def poll(self) -> set[Path]:
+        """
+        Chemins créés, modifiés ou supprimés depuis l'appel précédent.
+        """
+        current = self.snapshot()
+        previous, self._snapshot = self._snapshot, current
+        return {Path(p) for p in previous.keys() ^ current.keys()} | \
+               {Path(p) for p in previous.keys() & current.keys() if previous[p] != current[p]}
+
+    def wait(self) -> set[Path]:
+        """
+        Bloque jusqu'à la prochaine modification, retourne les chemins modifiés.
+        """
+        while True:
+            changes = self.poll()
+            if changes:
+                return changes
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class _QueueHandler(FileSystemEventHandler):
+
+    def __init__(self, events: queue.Queue):
+        super().__init__()
+        self.events = events
+
+    def on_any_event(self, event):
+        if getattr(event, "event_type", None) in ("opened", "closed_no_write"):
+            return
+        self.events.put(Path(os.fsdecode(event.src_path)))
+        dest_path = getattr(event, "dest_path", None)
+        if dest_path:
+            self.events.put(Path(os.fsdecode(dest_path)))
+
+
+class WatchdogWatcher(PollingWatcher):
+    """
+    Surveillance de fichiers par notifications du système (inotify, FSEvents, ReadDirectoryChangesW)
+    via watchdog. Les notifications reçues pendant debounce secondes sont regroupées.
+    """
+
+    def __init__(self, roots: list[Path], files: list[Path] = None, ignore: Callable[[Path], bool] = None,
+                 debounce: float = 0.3):
+        self.events = queue.Queue()
+        self.debounce = debounce
+        self.observer = Observer()
+        self._handler = _QueueHandler(self.events)
+        self._watched = set()
+        self._lock = threading.Lock()
+        self.roots = [Path(r) for r in roots]
+        self.ignore = ignore or (lambda p: False)
+        for root in self.roots:
+            self._schedule(root, recursive=True)
+        self.update_files(files or [])
+        self.observer.start()
+
+    def _schedule(self, path: Path, recursive: bool):
+        with self._lock:
+            if path in self._watched or not path.is_dir():
+                return
+            self.observer.schedule(self._handler, str(path), recursive=recursive)
+            self._watched.add(path)
+
+    def update_files(self, files: list[Path]):
+        self.files = {Path(f) for f in files}
+        # Les fichiers hors des dossiers surveillés : on surveille leur dossier parent
+        for p in self.files:
+            if not any(root == p.parent or root in p.parents for root in self.roots):
+                self._schedule(p.parent, recursive=False)
+
+    def _accept(self, p: Path) -> bool:
+        if p in self.files:
+            return True
+        return any(root in p.parents for root in self.roots) and not self.ignore(p)
+
+    def wait(self) -> set[Path]:
+        while True:
+            try:
+                # Attente par intervalles : un Ctrl+C reste pris en compte (notamment sous Windows)
+                changes = {self.events.get(timeout=0.5)}
+            except queue.Empty:
+                continue
+            deadline = time.monotonic() + self.debounce
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    changes.add(self.events.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            changes = {p for p in changes if self._accept(p)}
+            if changes:
+                return changes
+
+    def close(self):
+        self.observer.stop()
+        self.observer.join()
+
+
+def make_watcher(roots: list[Path], files: list[Path] = None, ignore: Callable[[Path], bool] = None,
+                 polling: bool = False, interval: float = 1.0, debounce: float = 0.3) -> PollingWatcher:
+    """
+    Watcher par notifications si watchdog est installé (extra `watch`), par scrutation sinon.
+    """
+    if Observer is not None and not polling:
+        return WatchdogWatcher(roots, files=files, ignore=ignore, debounce=debounce)
+    if Observer is None and not polling:
+        logger.info("watchdog non installé : surveillance des fichiers par scrutation (pip install docgen[watch])")
+    return PollingWatcher(roots, files=files, ignore=ignore, interval=interval)
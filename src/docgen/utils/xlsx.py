@@ -0,0 +1,224 @@
+from dataclasses import dataclass, field
+import logging
+from pathlib import Path, PurePosixPath
+import posixpath
+from xml.etree import ElementTree
+import zipfile
+
+from openpyxl.workbook.defined_name import DefinedName
+
+from docgen.utils.hashing import file_state
+
+logger = logging.getLogger(__name__)
+
+WORKBOOK_XML = "xl/workbook.xml"
+WORKBOOK_RELS = "xl/_rels/workbook.xml.rels"
+SHARED_STRINGS_XML = "xl/sharedStrings.xml"
+STYLES_XML = "xl/styles.xml"
+
+_NS = {
+    "main": "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+}
+_R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+
+# Signatures et index par classeur, valables pour un (mtime_ns, taille) du fichier
+_cache: dict[str, tuple[list[int], dict]] = {}
+_index_cache: dict[str, tuple[list[int], 'WorkbookIndex']] = {}
+
+
+def _relationships(zf: zipfile.ZipFile, member: str) -> dict[str, tuple[str, str]]:
+    """
+    Relations (type, membre cible) d'un membre de l'archive, par identifiant.
+    """
+    rels_member = posixpath.join(posixpath.dirname(member), "_rels", posixpath.basename(member) + ".rels")
+    if rels_member not in zf.NameToInfo:
+        return {}
+    result = {}
+    for rel in ElementTree.fromstring(zf.read(rels_member)).iterfind("rel:Relationship", _NS):
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = posixpath.normpath(str(PurePosixPath(member).parent / target))
+        result[rel.get("Id")] = (rel.get("Type", ""), target)
+    return result
+
+
+def sheet_members(zf: zipfile.ZipFile) -> dict[str, str]:
+    """
+    Membre de l'archive (xl/worksheets/sheetN.xml) de chaque feuille, par nom de feuille.
+    """
+    targets = {rid: target for rid, (_, target) in _relationships(zf, WORKBOOK_XML).items()}
+    workbook = ElementTree.fromstring(zf.read(WORKBOOK_XML))
+    return {sheet.get("name"): targets.get(sheet.get(_R_ID))
+            for sheet in workbook.iterfind("main:sheets/main:sheet", _NS)}
+
+
+def _read_signatures(path: Path) -> dict:
+    with zipfile.ZipFile(path) as zf:
+        # Répertoire central de l'archive : CRC32 et taille sans décompression
+        members = {info.filename: [info.CRC, info.file_size] for info in zf.infolist()}
+        sheets = sheet_members(zf)
+    return {"members": members, "sheets": sheets}
+
+
+def _signatures(path: Path) -> dict:
+    path = Path(path)
+    key = str(path)
+    try:
+        state = file_state(path)
+        cached = _cache.get(key)
+        if cached is None or cached[0] != state:
+            cached = _cache[key] = (state, _read_signatures(path))
+    except (OSError, KeyError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+        logger.debug(f"Signature xlsx indisponible pour {path}: {e}")
+        return None
+    return cached[1]
+
+
+def member_sizes(path: Path) -> dict[str, int]:
+    """
+    Taille décompressée de chaque membre de l'archive xlsx, vide si elle n'est pas lisible.
+    """
+    signatures = _signatures(path)
+    if signatures is None:
+        return {}
+    return {member: size for member, (_, size) in signatures["members"].items()}
+
+
+def sheet_signature(path: Path, sheet_name: str) -> list:
+    """
+    Signature [[membre, CRC32, taille], ...] des parties de l'archive xlsx dont dépend le contenu
+    d'une feuille : workbook.xml (feuilles, noms définis), sharedStrings.xml, styles.xml (formats
+    des nombres, qui font d'une valeur une date ou une durée) et la feuille elle-même.
+
+    Les valeurs sont lues dans le répertoire central du zip, sans décompression ni parsing des feuilles :
+    deux signatures identiques garantissent (au CRC près) un contenu identique, même si le fichier
+    a été enregistré à nouveau.
+
+    Retourne None si le fichier n'est pas une archive xlsx lisible.
+    """
+    signatures = _signatures(path)
+    if signatures is None:
+        return None
+    sheet_member = signatures["sheets"].get(sheet_name)
+    if sheet_member not in signatures["members"]:
+        return None
+    return [[member, *signatures["members"][member]]
+            for member in (WORKBOOK_XML, SHARED_STRINGS_XML, STYLES_XML, sheet_member)
+            if member in signatures["members"]]
+
+
+def _key(name: str) -> str:
+    # Noms de feuilles, noms définis et noms de tableaux sont insensibles à la casse dans Excel
+    return name.casefold()
+
+
+@dataclass
+class WorkbookIndex:
+    """
+    Index des métadonnées d'un classeur, lu dans workbook.xml et les relations des feuilles
+    sans charger le classeur : feuilles, noms définis (classeur et feuille), tableaux Excel.
+    Les dimensions des feuilles sont lues à la demande dans l'en-tête du XML de la feuille.
+
+    Les recherches sont insensibles à la casse, comme dans Excel.
+    """
+    path: Path
+    sheets: dict[str, str] = field(default_factory=dict) # nom -> membre, dans l'ordre du classeur
+    defined_names: dict[str, str] = field(default_factory=dict) # nom -> formule (Feuil1!$A$1:$B$2)
+    sheet_defined_names: dict[str, dict[str, str]] = field(default_factory=dict) # feuille -> nom -> formule
+    tables: dict[str, tuple[str, str]] = field(default_factory=dict) # nom -> (feuille, plage)
+    _dimensions: dict[str, str] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def read(cls, path: Path) -> 'WorkbookIndex':
+        result = cls(Path(path))
+        with zipfile.ZipFile(path) as zf:
+            result.sheets = sheet_members(zf)
+            sheet_names = list(result.sheets)
+            workbook = ElementTree.fromstring(zf.read(WORKBOOK_XML))
+            for element in workbook.iterfind("main:definedNames/main:definedName", _NS):
+                name, value, local_id = element.get("name"), element.text or "", element.get("localSheetId")
+                if local_id is None:
+                    result.defined_names[_key(name)] = value
+                elif int(local_id) < len(sheet_names):
+                    result.sheet_defined_names.setdefault(_key(sheet_names[int(local_id)]), {})[_key(name)] = value
+            for sheet_name, member in result.sheets.items():
+                for rel_type, target in _relationships(zf, member).values():
+                    if not rel_type.endswith("/table") or target not in zf.NameToInfo:
+                        continue
+                    table = ElementTree.fromstring(zf.read(target))
+                    name = table.get("displayName") or table.get("name")
+                    if name:
+                        result.tables[_key(name)] = (sheet_name, table.get("ref"))
+        return result
+
+    def sheet(self, name: str) -> str:
+        """
+        Nom exact de la feuille name, None si elle n'existe pas.
+        """
+        return next((s for s in self.sheets if _key(s) == _key(name)), None)
+
+    def defined_name(self, name: str, sheet_name: str = None) -> str:
+        """
+        Formule du nom défini : au niveau de la feuille sheet_name si précisée, du classeur sinon.
+        """
+        if sheet_name is not None:
+            return self.sheet_defined_names.get(_key(sheet_name), {}).get(_key(name))
+        return self.defined_names.get(_key(name))
+
+    def scoped_defined_names(self, name: str) -> list[str]:
+        """
+        Formules des noms définis name au niveau d'une feuille, toutes feuilles confondues.
+        """
+        return [names[_key(name)] for names in self.sheet_defined_names.values() if _key(name) in names]
+
+    def table(self, name: str) -> tuple[str, str]:
+        return self.tables.get(_key(name))
+
+    def dimension(self, sheet_name: str) -> str:
+        """
+        Plage utilisée de la feuille (<dimension ref="A1:H12"/>), None si absente.
+        """
+        if sheet_name not in self._dimensions:
+            ref = None
+            with zipfile.ZipFile(self.path) as zf, zf.open(self.sheets[sheet_name]) as f:
+                for _, element in ElementTree.iterparse(f):
+                    tag = element.tag.rsplit("}", 1)[-1]
+                    if tag == "dimension":
+                        ref = element.get("ref")
+                        break
+                    if tag == "sheetData" or tag == "row":
+                        break
+            self._dimensions[sheet_name] = ref
+        return self._dimensions[sheet_name]
+
+    def names(self) -> list[str]:
+        """
+        Noms connus (feuilles, noms définis, tableaux), pour les suggestions.
+        """
+        result = list(self.sheets)
+        for names in (self.defined_names, *self.sheet_defined_names.values(), self.tables):
+            result.extend(names)
+        return result
+
+    @staticmethod
+    def destinations(formula: str) -> list[tuple[str, str]]:
+        """
+        Plages (feuille, plage) désignées par la formule d'un nom défini.
+        """
+        return list(DefinedName("_", attr_text=formula).destinations)
+
+
+def workbook_index(path: Path) -> WorkbookIndex:
+    """
+    Index des métadonnées du classeur, relu seulement si le fichier a changé.
+    """
+    path = Path(path)
+    key = str(path)
+    state = file_state(path)
+    cached = _index_cache.get(key)
+    if cached is None or cached[0] != state:
+        cached = _index_cache[key] = (state, WorkbookIndex.read(path))
+    return cached[1]
@@ -3,6 +3,7 @@ from functools import partial
 import logging
 from pathlib import Path
 from docgen.settings import settings
+from docgen.utils.path import write_if_changed
 import yaml
 
 logger = logging.getLogger(__name__)
@@ -16,11 +17,11 @@ def read_yml(path:Path):
     
 def to_yml( path:Path,data: dict):
     """
-    Écrit un dictionnaire dans un fichier YAML.
+    Écrit un dictionnaire dans un fichier YAML, seulement si son contenu change (cf. write_if_changed).
     """
-    with open(path, 'w', encoding=settings.yml_encoding) as f:
-        yaml.dump(data, f, default_flow_style=False, allow_unicode=True, indent=2)
-    logger.debug(f"{path.name} mis à jour dans {path}")
+    content = yaml.dump(data, default_flow_style=False, allow_unicode=True, indent=2)
+    if write_if_changed(path, content, encoding=settings.yml_encoding):
+        logger.debug(f"{path.name} mis à jour dans {path}")
 
 
 def update_path(data,path,source,keys):
@@ -0,0 +1,91 @@
+import os
+from pathlib import Path
+
+import pytest
+
+import docgen.renderers.renderer as renderer_module
+from docgen.renderers.renderer import Renderer
+from docgen.settings import settings
+
+SLOT = "default"
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "dynotec_home", tmp_path / "home")
+    monkeypatch.setattr(renderer_module, "quarto_version", lambda: "1.7.0")
+    source = tmp_path / "source"
+    source.mkdir()
+    (source / "index.md").write_text("# Document\n\nVoir [@ref].\n", encoding="utf-8")
+    (source / "refs.bib").write_text("@book{ref, title={A}}\n", encoding="utf-8")
+    (source / "data.csv").write_text("a,b\n1,2\n", encoding="utf-8")
+    return source
+
+
+def pre_render(source: Path) -> tuple[Renderer, list[str]]:
+    """
+    Etapes du rendu précédant Quarto ; retourne le renderer et les documents racines à rendre.
+    """
+    r = Renderer(source=source, project_types=["default"], formats=["html"],
+                 output_dir=source.parent / "out", render_cache=False)
+    r.validate_persistent_state()
+    r.mirror_src()
+    r.set_variables_yml({})
+    r.pre_render(files=r.plan_pre_render())
+    roots = [p.relative_to(r.build_dir).as_posix() for p in r.parsed_items.not_included_files]
+    return r, r.files_to_render(SLOT, roots)
+
+
+def mark_rendered(r: Renderer):
+    r.dependency_graph.rendered[SLOT] = ["index.md"]
+    r.dependency_graph.save()
+
+
+def modify(path: Path, content: str):
+    path.write_text(content, encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_unchanged_source_renders_nothing(source):
+    r, to_render = pre_render(source)
+    assert to_render == ["index.md"]
+    mark_rendered(r)
+
+    _, to_render = pre_render(source)
+    assert to_render == []
+
+
+@pytest.mark.parametrize("name, content", [
+    ("refs.bib", "@book{ref, title={B}}\n"),
+    ("data.csv", "a,b\n3,4\n"),
+])
+def test_non_markdown_change_renders_everything(source, name, content):
+    r, _ = pre_render(source)
+    mark_rendered(r)
+
+    modify(source / name, content)
+    r, to_render = pre_render(source)
+    assert r.affected_documents is None
+    assert to_render == ["index.md"]
+
+
+def test_removed_non_markdown_file_renders_everything(source):
+    r, _ = pre_render(source)
+    mark_rendered(r)
+
+    (source / "data.csv").unlink()
+    _, to_render = pre_render(source)
+    assert to_render == ["index.md"]
+
+
+def test_persistent_state_reset_restores_mirrored_files(source, monkeypatch):
+    extension = source / "_extensions" / "other" / "_extension.yml"
+    extension.parent.mkdir(parents=True)
+    extension.write_text("title: other\n", encoding="utf-8")
+    r, _ = pre_render(source)
+    assert (r.build_dir / "_extensions" / "other" / "_extension.yml").exists()
+
+    monkeypatch.setattr(renderer_module, "quarto_version", lambda: "1.8.0")
+    r, _ = pre_render(source)
+    assert (r.build_dir / "_extensions" / "other" / "_extension.yml").exists()
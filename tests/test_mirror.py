@@ -0,0 +1,17 @@
+from docgen.utils.mirror import mirror
+
+
+def test_file_removed_from_dest_is_copied_again(tmp_path):
+    source, dest = tmp_path / "source", tmp_path / "dest"
+    (source / "img").mkdir(parents=True)
+    (source / "img" / "a.png").write_bytes(b"png")
+    manifest = tmp_path / "manifest.json"
+    mirror(source, dest, manifest=manifest)
+
+    (dest / "img" / "a.png").unlink()
+    result = mirror(source, dest, manifest=manifest)
+    assert result.copied == ["img/a.png"]
+    assert (dest / "img" / "a.png").read_bytes() == b"png"
+
+    result = mirror(source, dest, manifest=manifest)
+    assert result.copied == []